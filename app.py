@@ -2,8 +2,9 @@ import streamlit as st
 import re
 import os
 
-from utils import init_connection
+from utils import init_connection, is_admin
 from postgres_operator import PostgresOperator
+from workload import workload_stats
 
 # Import main functions from other appss
 from pages.app_budget_allocating import main as budget_main
@@ -11,10 +12,17 @@ from pages.app_config_setting import main as config_main
 from pages.app_reporting import main as reporting_main
 from pages.app_expense_submitting import main as expense_main
 from pages.app_income_statement import main as income_main
+from pages.app_transaction_history import main as history_main
+from pages.app_profiler import main as profiler_main
+from profiler import profile_rerun
+from session_store import check_session, persist_state, start_session, end_session
 
 db_pool = init_connection()
 db_operator = PostgresOperator(db_pool)
 
+# Duplicate reads within this script run are served from the operator's rerun memo
+PostgresOperator.begin_rerun()
+
 def verify_user(username, password):
     query_path = 'queries/verify_user.sql'
     results, error = db_operator.execute_select(query_path, (username,))
@@ -67,6 +75,7 @@ def get_log_from_readme(readme_path="README.md"):
 # Navigation function to switch pages
 def navigate_to(page):
     st.session_state.current_page = page
+    persist_state("current_page")
     st.rerun()
 
 def render_log_page():
@@ -89,19 +98,20 @@ def render_log_page():
 # Set page title
 st.title("Personal Finance App")
 
-# Initialize session state
+# Initialize session state; login status lives only in this Streamlit session, never in the session store
 if "logged_in" not in st.session_state:
     st.session_state.logged_in = False
     st.session_state.username = ""
     st.session_state.user_id = None
 if "current_page" not in st.session_state:
     st.session_state.current_page = "login"  # Default to login page
+check_session()
 
 # Handle logged-in state
 if st.session_state.logged_in:
     # Navigation buttons at the top
     st.subheader(f"Welcome, {st.session_state.username.upper()}!")
-    col1, col2, col3, col4, col5, col6, col7 = st.columns(7)
+    col1, col2, col3, col4, col5, col6, col7, col8 = st.columns(8)
     with col1:
         if st.button("Log"):
             navigate_to("log")
@@ -121,13 +131,23 @@ if st.session_state.logged_in:
         if st.button("Income"):
             navigate_to("income")
     with col7:
+        if st.button("History"):
+            navigate_to("history")
+    with col8:
         if st.button("Logout"):
+            end_session()
             st.session_state.logged_in = False
             st.session_state.username = ""
             st.session_state.user_id = None
             st.session_state.current_page = "login"
             st.rerun()
 
+    # Opt-in profiling for admins: ?profile=1 times each page render, ?profile=cprofile also captures cProfile output
+    profile_mode = st.query_params.get("profile") if is_admin() else None
+    if profile_mode in ("1", "cprofile"):
+        if st.button("Profiler"):
+            navigate_to("profiler")
+
     # Render the appropriate page based on current_page
     page_functions = {
         "log": render_log_page,
@@ -135,11 +155,31 @@ if st.session_state.logged_in:
         "config": config_main,
         "reporting": reporting_main,
         "budget": budget_main,
-        "income": income_main
+        "income": income_main,
+        "history": history_main,
+        "profiler": profiler_main
     }
 
     # Call the function or show default message
-    page_functions.get(st.session_state.current_page, lambda: st.write("Select an app to proceed."))()
+    with profile_rerun(
+        st.session_state.current_page,
+        enabled=profile_mode in ("1", "cprofile") and st.session_state.current_page != "profiler",
+        capture_cprofile=profile_mode == "cprofile"
+    ):
+        page_functions.get(st.session_state.current_page, lambda: st.write("Select an app to proceed."))()
+
+    # Show process-wide query memo and workload counters to admins with ?debug=1
+    if st.query_params.get("debug") == "1" and is_admin():
+        stats = PostgresOperator.memo_stats()
+        st.caption(
+            f"Query memo: {stats['run_hits']} hit(s) / {stats['run_hits'] + stats['run_misses']} read(s) this run, "
+            f"{stats['total_hits']} hit(s) / {stats['total_hits'] + stats['total_misses']} read(s) since start."
+        )
+        st.caption("Workloads: " + ", ".join(
+            f"{name} {stats['in_flight']}/{stats['max_concurrency']} running, {stats['rejected']} rejected, "
+            f"{stats['timed_out']} timed out, {stats['cancelled']} cancelled"
+            for name, stats in workload_stats().items()
+        ))
 
 # Handle login form for non-logged-in users
 else:
@@ -156,6 +196,8 @@ else:
                     st.session_state.username = user_data["username"]
                     st.session_state.user_id = user_data["user_id"]
                     st.session_state.current_page = "log"  # Default page after login
+                    start_session(user_data["user_id"])
+                    persist_state("current_page")
                     st.success("Login successful! Use the buttons above to navigate.")
                     st.rerun()
                 else:
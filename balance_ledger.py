@@ -0,0 +1,91 @@
+import argparse
+from datetime import date, datetime
+
+from utils import init_connection
+from postgres_operator import PostgresOperator
+
+def install_ledger(db_operator):
+    """Create the ledger tables and trigger, then build the ledger from the existing history."""
+    _, error = db_operator.execute_insert('queries/create_balance_ledger.sql')
+    if error:
+        return False, error
+    return rebuild_ledger(db_operator)
+
+def rebuild_ledger(db_operator, user_id=None):
+    """Recompute the ledger from fact_transaction for one user (or everyone) and drop their checkpoints."""
+    _, error = db_operator.execute_insert('queries/rebuild_balance_ledger.sql', {"user_id": user_id})
+    if error:
+        return False, error
+    return True, None
+
+def verify_ledger(db_operator, user_id=None):
+    """Return the (user, category, month) rows where the ledger disagrees with fact_transaction."""
+    return db_operator.execute_select('queries/select_balance_ledger_mismatches.sql', {"user_id": user_id})
+
+def verify_checkpoints(db_operator, user_id=None):
+    """Return the checkpoints whose closing balance disagrees with the ledger up to their month."""
+    return db_operator.execute_select('queries/select_balance_checkpoint_mismatches.sql', {"user_id": user_id})
+
+def delete_stale_checkpoints(db_operator, user_id=None):
+    return db_operator.execute_insert('queries/delete_balance_checkpoint_mismatches.sql', {"user_id": user_id})
+
+def checkpoint_ledger(db_operator, checkpoint_month, user_id=None):
+    """Store the closing balances of `checkpoint_month` so balance reads only add the months after it."""
+    return db_operator.execute_insert(
+        'queries/insert_balance_checkpoints.sql',
+        {"checkpoint_month": checkpoint_month.replace(day=1), "user_id": user_id}
+    )
+
+def previous_month(today=None):
+    today = today or date.today()
+    first_of_month = today.replace(day=1)
+    return (first_of_month.replace(year=first_of_month.year - 1, month=12) if first_of_month.month == 1
+            else first_of_month.replace(month=first_of_month.month - 1))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the running-balance ledger of fact_transaction.")
+    parser.add_argument("command", choices=["install", "verify", "rebuild", "checkpoint"])
+    parser.add_argument("--user-id", type=int, default=None, help="Limit the command to one user.")
+    parser.add_argument("--month", default=None, help="Checkpoint month as yyyy-mm (defaults to the previous month).")
+    parser.add_argument("--fix", action="store_true",
+                        help="Rebuild the ledger or drop stale checkpoints when verify finds mismatches.")
+    args = parser.parse_args()
+
+    db_pool = init_connection()
+    db_operator = PostgresOperator(db_pool)
+
+    if args.command == "install":
+        ok, error = install_ledger(db_operator)
+        print("Ledger installed." if ok else f"Failed to install ledger: {error}")
+    elif args.command == "rebuild":
+        ok, error = rebuild_ledger(db_operator, args.user_id)
+        print("Ledger rebuilt." if ok else f"Failed to rebuild ledger: {error}")
+    elif args.command == "verify":
+        mismatches, error = verify_ledger(db_operator, args.user_id)
+        if error:
+            raise SystemExit(f"Failed to verify ledger: {error}")
+        stale_checkpoints, error = verify_checkpoints(db_operator, args.user_id)
+        if error:
+            raise SystemExit(f"Failed to verify checkpoints: {error}")
+
+        for row in mismatches:
+            print(f"user={row['user_id']} category={row['category_id']} month={row['balance_month']}: "
+                  f"expected {row['expected_net_change']:,.0f}, ledger {row['ledger_net_change']:,.0f}")
+        for row in stale_checkpoints:
+            print(f"user={row['user_id']} category={row['category_id']} checkpoint={row['checkpoint_month']}: "
+                  f"closing balance {row['closing_balance']:,.0f}, ledger {row['ledger_balance']:,.0f}")
+        if not mismatches and not stale_checkpoints:
+            print("Ledger and checkpoints are consistent with fact_transaction.")
+        else:
+            print(f"{len(mismatches)} mismatched ledger row(s), {len(stale_checkpoints)} stale checkpoint(s).")
+            if args.fix and mismatches:
+                # Rebuilding also drops the checkpoints of the rebuilt users
+                ok, error = rebuild_ledger(db_operator, args.user_id)
+                print("Ledger rebuilt." if ok else f"Failed to rebuild ledger: {error}")
+            elif args.fix:
+                rows, error = delete_stale_checkpoints(db_operator, args.user_id)
+                print(f"Deleted {rows} stale checkpoint(s)." if not error else f"Failed to delete checkpoints: {error}")
+    elif args.command == "checkpoint":
+        month = datetime.strptime(args.month, "%Y-%m").date() if args.month else previous_month()
+        rows, error = checkpoint_ledger(db_operator, month, args.user_id)
+        print(f"Checkpointed {rows} balance(s) for {month:%Y-%m}." if not error else f"Failed to checkpoint: {error}")
@@ -0,0 +1,146 @@
+"""
+Headless monthly statements for every user in dim_user (runs without the Streamlit app).
+
+Usage:
+    python batch_reports.py --month 2025-05 --formats csv,html --workers 8 --db-concurrency 4
+
+Database credentials are read from the environment (or a .env file): DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT.
+"""
+import argparse
+import html
+import multiprocessing
+import multiprocessing.util
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+from utils import connect
+from report_builder import REPORT_COLUMNS, split_report_rows, summarize_report, numeric_report_rows, format_report_rows
+
+SUPPORTED_FORMATS = ("csv", "parquet", "html")
+
+# Per-process state, set by init_worker()
+_worker_conn = None
+_worker_db_semaphore = None
+
+def execute_select(conn, query_path, params=None):
+    """Execute a SELECT query from a .sql file and return results as a list of dicts."""
+    with open(query_path, 'r') as f:
+        query = f.read().strip()
+        if not query:
+            raise ValueError(f"Query '{query_path}' not found.")
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+def init_worker(db_semaphore):
+    global _worker_conn, _worker_db_semaphore
+    _worker_db_semaphore = db_semaphore
+    _worker_conn = connect()
+    # Pool workers exit through multiprocessing, which runs its finalizers but not atexit hooks
+    multiprocessing.util.Finalize(None, _worker_conn.close, exitpriority=10)
+
+def render_html(username, month_str, display_rows, summary):
+    summary_rows = "".join(
+        f"<tr><th>{label}</th><td>{value}</td></tr>"
+        for label, value in [
+            ("Total Budget", f"{summary['total_budget']:,.0f}"),
+            ("Total Expenses", f"{summary['total_expenses']:,.0f}"),
+            ("Total Remaining", f"{summary['total_remaining']:,.0f}"),
+            ("Percentage Spent", f"{summary['percentage_spent']:.2f}%"),
+        ]
+    )
+    return (
+        f"<html><head><meta charset='utf-8'><title>{html.escape(username)} - {month_str}</title></head><body>"
+        f"<h1>Budget Overview for {month_str}</h1><h2>{html.escape(username)}</h2>"
+        f"<table>{summary_rows}</table>"
+        f"{pd.DataFrame(display_rows, columns=REPORT_COLUMNS).to_html(index=False)}"
+        f"</body></html>"
+    )
+
+def statement_filename(user):
+    """File name stem from the user id and a filesystem-safe form of the username (never a path)."""
+    safe_name = re.sub(r"[^A-Za-z0-9_-]+", "_", user["username"]).strip("_")
+    return f"{user['user_id']}_{safe_name}" if safe_name else str(user["user_id"])
+
+def generate_statement(user, selected_month, output_dir, formats):
+    """Build and write the monthly statement of one user. Runs inside a worker process."""
+    # Only the query is bounded by the database semaphore; pivoting and writing run fully in parallel
+    with _worker_db_semaphore:
+        results = execute_select(
+            _worker_conn,
+            "queries/select_expense_report_by_period.sql",
+            {"user_id": user["user_id"], "selected_month": selected_month}
+        )
+    table_rows, total_row = split_report_rows(results)
+    summary = summarize_report(total_row)
+    report_df = pd.DataFrame(numeric_report_rows(table_rows), columns=REPORT_COLUMNS)
+
+    base_path = os.path.join(output_dir, statement_filename(user))
+    if "csv" in formats:
+        report_df.to_csv(f"{base_path}.csv", index=False)
+    if "parquet" in formats:
+        report_df.to_parquet(f"{base_path}.parquet", index=False)
+    if "html" in formats:
+        with open(f"{base_path}.html", "w", encoding="utf-8") as f:
+            f.write(render_html(user["username"], selected_month.strftime('%B %Y'), format_report_rows(table_rows), summary))
+    return user["username"], len(report_df), summary
+
+def generate_all_statements(selected_month, output_dir, formats, workers, db_concurrency):
+    """Generate statements for every user across a process pool. Returns (succeeded, failed) lists."""
+    conn = connect()
+    try:
+        users = execute_select(conn, "queries/select_users.sql")
+    finally:
+        conn.close()
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    succeeded, failed = [], []
+    with multiprocessing.Manager() as manager:
+        db_semaphore = manager.BoundedSemaphore(db_concurrency)
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(db_semaphore,)) as executor:
+            futures = {
+                executor.submit(generate_statement, user, selected_month, output_dir, formats): user
+                for user in users
+            }
+            for future in as_completed(futures):
+                user = futures[future]
+                try:
+                    succeeded.append(future.result())
+                except Exception as e:
+                    failed.append((user["username"], str(e)))
+    return succeeded, failed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate monthly statements for every user.")
+    parser.add_argument("--month", required=True, help="Statement month as yyyy-mm.")
+    parser.add_argument("--output-dir", default="reports", help="Directory to write the statements to.")
+    parser.add_argument("--formats", default="csv,html", help=f"Comma-separated output formats: {', '.join(SUPPORTED_FORMATS)}.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Number of worker processes.")
+    parser.add_argument("--db-concurrency", type=int, default=4, help="Maximum concurrent database queries.")
+    args = parser.parse_args()
+
+    formats = {fmt.strip().lower() for fmt in args.formats.split(",") if fmt.strip()}
+    unsupported = formats - set(SUPPORTED_FORMATS)
+    if unsupported:
+        parser.error(f"Unsupported format(s): {', '.join(sorted(unsupported))}")
+
+    selected_month = datetime.strptime(args.month, "%Y-%m").date()
+    output_dir = os.path.join(args.output_dir, selected_month.strftime("%Y-%m"))
+
+    start = time.perf_counter()
+    succeeded, failed = generate_all_statements(
+        selected_month, output_dir, formats, args.workers, min(args.db_concurrency, args.workers)
+    )
+    elapsed = time.perf_counter() - start
+
+    for username, error in failed:
+        print(f"Failed to generate statement for {username}: {error}")
+    print(f"Generated {len(succeeded)} statement(s) in {output_dir} in {elapsed:.1f}s ({len(failed)} failed).")
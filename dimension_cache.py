@@ -0,0 +1,51 @@
+import streamlit as st
+
+from postgres_operator import PostgresOperator
+from utils import init_connection
+
+# Buckets, categories and locations change only from the Configs page, so they are cached across reruns and
+# sessions instead of being queried on every rerun. Loaders raise on database errors so failures are not cached.
+# clear_dimensions() only clears this process, so the TTL bounds how long other app replicas serve stale entries.
+
+db_pool = init_connection()
+db_operator = PostgresOperator(db_pool)
+
+DIMENSION_TTL_S = 60
+
+def _select(query_path, params=None):
+    results, error = db_operator.execute_select(query_path, params)
+    if error:
+        raise ConnectionError(error)
+    return results or []
+
+def _group_by_bucket(rows):
+    categories = {}
+    for row in rows:
+        categories.setdefault(row['bucket_name'], {})[row['name']] = row['id']
+    return categories
+
+@st.cache_data(ttl=DIMENSION_TTL_S, show_spinner=False)
+def all_buckets():
+    return {row["name"]: row["id"] for row in _select('queries/select_buckets_all.sql')}
+
+@st.cache_data(ttl=DIMENSION_TTL_S, show_spinner=False)
+def spendable_buckets():
+    return {row["name"]: row["id"] for row in _select('queries/select_buckets_spendable.sql')}
+
+@st.cache_data(ttl=DIMENSION_TTL_S, show_spinner=False)
+def categories_by_bucket(user_id):
+    return _group_by_bucket(_select('queries/select_categories_all.sql', (user_id,)))
+
+@st.cache_data(ttl=DIMENSION_TTL_S, show_spinner=False)
+def spendable_categories_by_bucket(user_id):
+    return _group_by_bucket(_select('queries/select_categories_spendable.sql', (user_id,)))
+
+@st.cache_data(ttl=DIMENSION_TTL_S, show_spinner=False)
+def user_locations(user_id):
+    return {row['name']: row['id'] for row in _select('queries/select_locations.sql', (user_id,))}
+
+def clear_dimensions():
+    """Drop this process's cached categories and locations after a config write (all users; writes are rare)."""
+    categories_by_bucket.clear()
+    spendable_categories_by_bucket.clear()
+    user_locations.clear()
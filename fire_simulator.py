@@ -0,0 +1,76 @@
+import numpy as np
+
+def derive_profile(monthly_rows):
+    """
+    Derive the savings profile of a user from monthly income/spending history.
+    `monthly_rows` is a list of dicts with keys: month, net_income, spending.
+    Returns annualized income, spending mean/std and the savings rate, or None if there is no history.
+    The savings rate is None when there is no net income to save from.
+    """
+    if not monthly_rows:
+        return None
+
+    net_income = np.array([float(row["net_income"] or 0) for row in monthly_rows])
+    spending = np.array([float(row["spending"] or 0) for row in monthly_rows])
+
+    total_income = net_income.sum()
+    savings_rate = (total_income - spending.sum()) / total_income if total_income > 0 else None
+
+    return {
+        "months": len(monthly_rows),
+        "annual_income": float(net_income.mean() * 12),
+        "annual_spending_mean": float(spending.mean() * 12),
+        # Yearly spending of 12 independent months: std scales with sqrt(12)
+        "annual_spending_std": float(spending.std() * np.sqrt(12)),
+        "savings_rate": None if savings_rate is None else float(savings_rate),
+    }
+
+def simulate_time_to_fi(
+    current_portfolio,
+    annual_income,
+    annual_spending_mean,
+    annual_spending_std,
+    expected_return=0.07,
+    return_volatility=0.15,
+    inflation_mean=0.035,
+    inflation_volatility=0.01,
+    withdrawal_rate=0.04,
+    max_years=60,
+    n_paths=20000,
+    seed=None,
+):
+    """
+    Monte Carlo projection of the time to Financial Independence.
+    All paths are simulated at once: every yearly step is a vectorized NumPy operation over `n_paths`.
+    A path reaches FI in the first year its portfolio covers the (inflated) spending at `withdrawal_rate`.
+    Returns a dict with the per-path years to FI (NaN when never reached) and the cumulative success curve.
+    """
+    rng = np.random.default_rng(seed)
+
+    returns = rng.normal(expected_return, return_volatility, size=(max_years, n_paths))
+    inflation = rng.normal(inflation_mean, inflation_volatility, size=(max_years, n_paths))
+    spending_noise = rng.normal(0.0, annual_spending_std, size=(max_years, n_paths))
+    # Price level at the end of each year, per path
+    price_level = np.cumprod(1.0 + inflation, axis=0)
+
+    portfolio = np.full(n_paths, float(current_portfolio))
+    years_to_fi = np.full(n_paths, np.nan)
+
+    for year in range(max_years):
+        spending = np.maximum(annual_spending_mean + spending_noise[year], 0.0) * price_level[year]
+        savings = annual_income * price_level[year] - spending
+        portfolio = portfolio * (1.0 + returns[year]) + savings
+
+        reached = np.isnan(years_to_fi) & (portfolio * withdrawal_rate >= spending)
+        years_to_fi[reached] = year + 1
+
+    years = np.arange(1, max_years + 1)
+    success_by_year = (years_to_fi[None, :] <= years[:, None]).mean(axis=1)
+
+    return {
+        "years_to_fi": years_to_fi,
+        "years": years,
+        "success_by_year": success_by_year,
+        "success_probability": float(success_by_year[-1]),
+        "median_years": float(np.nanmedian(years_to_fi)) if not np.isnan(years_to_fi).all() else None,
+    }
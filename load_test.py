@@ -0,0 +1,254 @@
+"""
+Concurrent-session load test against a local PostgreSQL database.
+
+Simulates N user sessions, each on its own thread like Streamlit script runs, repeatedly running the app's flows
+(login, expense entry, budget save, report view) through PostgresOperator and the queries/ files the pages use.
+Writes real rows into fact_transaction: run it against a local or disposable database only.
+
+Usage:
+    python load_test.py --username demo --password demo --concurrency 1,5,10,20,40 --duration 30
+
+Database credentials are read from the environment (or a .env file): DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT.
+"""
+import argparse
+import random
+import threading
+import time
+from datetime import date
+
+from psycopg2 import pool
+
+from postgres_operator import PostgresOperator
+from utils import connection_params
+from workload import WORKLOAD_CLASSES
+
+FLOW_WEIGHTS = {"login": 1, "expense": 4, "budget": 2, "report": 3}
+
+class InstrumentedPool:
+    """
+    Connection pool of `maxconn` connections (as in utils.init_connection) that blocks when exhausted
+    and records how long each getconn() waited for a free connection. At the default size the workload class
+    limits keep it from ever blocking; it only shows waits with a smaller --pool-size.
+    """
+    def __init__(self, minconn, maxconn, **params):
+        self._pool = pool.ThreadedConnectionPool(minconn, maxconn, **params)
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self.waits = []
+
+    def getconn(self):
+        start = time.perf_counter()
+        self._slots.acquire()
+        waited = time.perf_counter() - start
+        with self._lock:
+            self.waits.append(waited)
+        try:
+            return self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn):
+        self._pool.putconn(conn)
+        self._slots.release()
+
+    def reset_stats(self):
+        with self._lock:
+            self.waits = []
+
+    def closeall(self):
+        self._pool.closeall()
+
+class WorkloadRecorder:
+    """
+    Records how long queries waited for a slot in their workload class, and the per-class rejections and
+    timeouts. With the class limits adding up to the pool size, this is where queueing happens.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waits = {name: [] for name in WORKLOAD_CLASSES}
+        self._baseline = {}
+        for name, workload in WORKLOAD_CLASSES.items():
+            workload.wait_observer = lambda waited, name=name: self._record(name, waited)
+
+    def _record(self, name, waited):
+        with self._lock:
+            self.waits[name].append(waited)
+
+    def reset_stats(self):
+        with self._lock:
+            self.waits = {name: [] for name in WORKLOAD_CLASSES}
+        # Class counters are process-wide, so each level reports the difference from its start
+        self._baseline = {
+            name: (workload.rejected, workload.timed_out) for name, workload in WORKLOAD_CLASSES.items()
+        }
+
+    def stats(self):
+        with self._lock:
+            waits = {name: sorted(values) for name, values in self.waits.items()}
+        return {
+            name: {
+                "queries": len(waits[name]),
+                "wait_p50": percentile(waits[name], 50),
+                "wait_p95": percentile(waits[name], 95),
+                "rejected": workload.rejected - self._baseline.get(name, (0, 0))[0],
+                "timed_out": workload.timed_out - self._baseline.get(name, (0, 0))[1],
+            }
+            for name, workload in WORKLOAD_CLASSES.items()
+        }
+
+def select(db_operator, query_path, params=None):
+    results, error = db_operator.execute_select(query_path, params)
+    if error:
+        raise RuntimeError(f"{query_path}: {error}")
+    return results
+
+def write(db_operator, query_path, params=None):
+    rows, error = db_operator.execute_insert(query_path, params)
+    if error:
+        raise RuntimeError(f"{query_path}: {error}")
+    return rows
+
+def flow_login(db_operator, session):
+    results = select(db_operator, 'queries/verify_user.sql', (session["username"],))
+    if not results or results[0]["password"] != session["password"]:
+        raise RuntimeError("Invalid username or password.")
+    session["user_id"] = results[0]["user_id"]
+
+def flow_expense(db_operator, session):
+    user_id = session["user_id"]
+    select(db_operator, 'queries/select_buckets_spendable.sql')
+    categories = select(db_operator, 'queries/select_categories_spendable.sql', (user_id,))
+    locations = select(db_operator, 'queries/select_locations.sql', (user_id,))
+    select(db_operator, 'queries/select_latest_transaction_date.sql', (user_id,))
+    if not categories:
+        raise RuntimeError("User has no spendable categories.")
+    category_id = random.choice(categories)["id"]
+    location_id = random.choice(locations)["id"] if locations else None
+    write(db_operator, 'queries/insert_expenses.sql',
+          (date.today(), "Load test expense", random.randint(1, 100) * 1000, category_id, 4, user_id, location_id))
+
+def flow_budget(db_operator, session):
+    user_id = session["user_id"]
+    budget_som = date.today().replace(day=1)
+    select(db_operator, 'queries/select_latest_transaction_date.sql', (user_id,))
+    select(db_operator, 'queries/select_total_net_income_by_period.sql', (budget_som, user_id,))
+    existing_allocations = select(db_operator, 'queries/select_existing_budget_allocations_by_period.sql', (budget_som, user_id,))
+    for bucket in select(db_operator, 'queries/select_buckets_spendable.sql'):
+        select(db_operator, 'queries/select_categories.sql', (bucket["id"], user_id,))
+    # Save: update the existing allocations in place so repeated runs do not grow the month's budget
+    for allocation in existing_allocations:
+        write(db_operator, 'queries/update_budget_allocations.sql',
+              (allocation["amount"], "Load test allocation update", allocation["transaction_id"]))
+
+def flow_report(db_operator, session):
+    user_id = session["user_id"]
+    selected_month = date.today().replace(day=1)
+    select(db_operator, 'queries/select_latest_transaction_date.sql', (user_id,))
+    select(db_operator, 'queries/select_expense_report_by_period.sql', {"user_id": user_id, "selected_month": selected_month})
+
+FLOWS = {"login": flow_login, "expense": flow_expense, "budget": flow_budget, "report": flow_report}
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    idx = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[idx]
+
+def run_session(db_operator, session, deadline, results, lock):
+    flow_names = list(FLOW_WEIGHTS)
+    weights = [FLOW_WEIGHTS[name] for name in flow_names]
+    try:
+        flow_login(db_operator, session)
+    except Exception as e:
+        with lock:
+            results.append(("login", 0.0, str(e)))
+        return
+    while time.perf_counter() < deadline:
+        name = random.choices(flow_names, weights=weights)[0]
+        # Every flow is one simulated rerun
+        PostgresOperator.begin_rerun()
+        start = time.perf_counter()
+        try:
+            FLOWS[name](db_operator, session)
+            error = None
+        except Exception as e:
+            error = str(e)
+        elapsed = time.perf_counter() - start
+        with lock:
+            results.append((name, elapsed, error))
+
+def run_level(db_pool, recorder, db_operator, concurrency, duration, username, password):
+    """Run `concurrency` sessions for `duration` seconds and return the level's statistics."""
+    db_pool.reset_stats()
+    recorder.reset_stats()
+    results, lock = [], threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(
+            target=run_session,
+            args=(db_operator, {"username": username, "password": password}, deadline, results, lock),
+            daemon=True,
+        )
+        for _ in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for _, latency, error in results if error is None)
+    waits = sorted(db_pool.waits)
+    errors = [error for _, _, error in results if error is not None]
+    return {
+        "concurrency": concurrency,
+        "flows": len(results),
+        "throughput": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "wait_p50": percentile(waits, 50),
+        "wait_p95": percentile(waits, 95),
+        "wait_total": sum(waits),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "workloads": recorder.stats(),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test concurrent user sessions against a local database.")
+    parser.add_argument("--username", required=True, help="Existing dim_user username to log in as.")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", default="1,5,10,20,40", help="Comma-separated session counts to run.")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run each concurrency level.")
+    parser.add_argument("--pool-size", type=int, default=20, help="Maximum pooled connections (utils.init_connection uses 20).")
+    args = parser.parse_args()
+
+    db_pool = InstrumentedPool(1, args.pool_size, **connection_params())
+    db_operator = PostgresOperator(db_pool)
+    recorder = WorkloadRecorder()
+
+    header = f"{'sessions':>8} {'flows':>7} {'flows/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'wait p50':>9} {'wait p95':>9} {'errors':>7}"
+    print(header)
+    try:
+        for concurrency in [int(level) for level in args.concurrency.split(",") if level.strip()]:
+            stats = run_level(db_pool, recorder, db_operator, concurrency, args.duration, args.username, args.password)
+            print(
+                f"{stats['concurrency']:>8} {stats['flows']:>7} {stats['throughput']:>8.1f} "
+                f"{stats['p50'] * 1000:>8.1f} {stats['p95'] * 1000:>8.1f} {stats['p99'] * 1000:>8.1f} "
+                f"{stats['wait_p50'] * 1000:>9.1f} {stats['wait_p95'] * 1000:>9.1f} {stats['errors']:>7}"
+            )
+            for name, workload_stats in stats["workloads"].items():
+                if not workload_stats["queries"]:
+                    continue
+                print(
+                    f"    {name:<11} {workload_stats['queries']:>7} queries, slot wait p50 "
+                    f"{workload_stats['wait_p50'] * 1000:.1f} ms / p95 {workload_stats['wait_p95'] * 1000:.1f} ms, "
+                    f"{workload_stats['rejected']} rejected, {workload_stats['timed_out']} timed out"
+                )
+            if stats["first_error"]:
+                print(f"    first error: {stats['first_error']}")
+    finally:
+        db_pool.closeall()
@@ -7,6 +7,8 @@ import altair as alt
 
 from postgres_operator import PostgresOperator
 from utils import init_connection, check_login
+from profiler import profile_phase
+from session_store import restore_state, persist_state
 
 db_pool = init_connection()
 db_operator = PostgresOperator(db_pool=db_pool)
@@ -78,6 +80,33 @@ def update_allocations(transaction_id, price, quantity, amount):
         return False
     return True
 
+def select_budget_rollover_preview(source_month, target_month, scale, overwrite, user_id):
+    results, error = db_operator.execute_select(
+        'queries/select_budget_rollover_preview.sql',
+        {"source_month": source_month, "target_month": target_month, "scale": scale, "overwrite": overwrite, "user_id": user_id}
+    )
+    if error:
+        st.error(f"Failed to fetch data: {error}")
+        return None
+    return results
+
+def rollover_allocations(source_month, target_month, scale, overwrite, user_id):
+    """Copy (and scale) the allocations of the source month into the target month in a single statement."""
+    description = f"Rolled over from {source_month.strftime('%Y-%m')} at {scale * 100:.0f}%"
+    params = {"source_month": source_month, "target_month": target_month, "scale": scale, 
+              "overwrite": overwrite, "user_id": user_id, "description": description}
+    try:
+        # The lock is its own statement so the rollover's snapshot sees any rollover committed while waiting
+        with db_operator.transaction(workload="reporting") as tx:
+            tx.select("queries/select_lock_budget_rollover.sql", params)
+            return tx.select("queries/insert_budget_rollover.sql", params)[0]
+    except Exception as e:
+        st.error(f"Failed to roll over budgets: {e}")
+        return None
+
+def previous_month(month):
+    return month.replace(year=month.year - 1, month=12) if month.month == 1 else month.replace(month=month.month - 1)
+
 def initialize_session_state():
     if "date" not in st.session_state:
         st.session_state.date = datetime.now()
@@ -87,10 +116,11 @@ def initialize_session_state():
         st.session_state.net_income = 0.0
     if "total_amount" not in st.session_state:
         st.session_state.total_amount = 0.0
-    if 'data' not in st.session_state:
-        st.session_state.data = []
+    restore_state('data', [])
     if 'selected_category' not in st.session_state:
         st.session_state.selected_category = None
+    if 'rollover_preview' not in st.session_state:
+        st.session_state.rollover_preview = None
 
 def update_data(bucket_name, category_name, category_id, price, quantity, amount):
     for entry in st.session_state.data:
@@ -101,6 +131,7 @@ def update_data(bucket_name, category_name, category_id, price, quantity, amount
                 'quantity': quantity,
                 'amount': amount
             })
+            persist_state('data')
             return
     st.session_state.data.append({
         'bucket_name': bucket_name,
@@ -110,6 +141,7 @@ def update_data(bucket_name, category_name, category_id, price, quantity, amount
         'quantity': quantity,
         'amount': amount
     })
+    persist_state('data')
 
 # def calculate_total_amount():
 #     return sum(item['amount'] for item in st.session_state.data)
@@ -142,7 +174,7 @@ def main():
     existing_allocations = select_existing_budget_allocations(budget_som, user_id)
 
     # Tabs for input and summary
-    input_tab, summary_tab = st.tabs(["Input", "Summary"])
+    input_tab, summary_tab, rollover_tab = st.tabs(["Input", "Summary", "Rollover"])
 
     with input_tab:
         st.header("Budget Allocation by Bucket")
@@ -197,20 +229,22 @@ def main():
                 st.success(f"Total allocated: {total_amount:,.0f} VND of {net_income:,.0f} VND ({percentage_used:.1f}%)")
 
             # Pie chart
-            df_pie = df.copy()
-            df_pie['amount'] = pd.to_numeric(df_pie['amount'], errors='coerce')
-            pie_data = df_pie.groupby('bucket_name')['amount'].sum().reset_index()
-
-            chart = alt.Chart(pie_data).mark_arc().encode(
-                theta=alt.Theta(field="amount", type="quantitative"),
-                color=alt.Color(field="bucket_name", type="nominal", scale=alt.Scale(range=['#4B8BBE', '#FFD43B'])),
-                tooltip=['bucket_name', 'amount']
-            ).properties(
-                title='Amount by Bucket',
-                width=400,
-                height=400
-            )
-            st.altair_chart(chart, use_container_width=True)
+            with profile_phase("transform"):
+                df_pie = df.copy()
+                df_pie['amount'] = pd.to_numeric(df_pie['amount'], errors='coerce')
+                pie_data = df_pie.groupby('bucket_name')['amount'].sum().reset_index()
+
+            with profile_phase("chart"):
+                chart = alt.Chart(pie_data).mark_arc().encode(
+                    theta=alt.Theta(field="amount", type="quantitative"),
+                    color=alt.Color(field="bucket_name", type="nominal", scale=alt.Scale(range=['#4B8BBE', '#FFD43B'])),
+                    tooltip=['bucket_name', 'amount']
+                ).properties(
+                    title='Amount by Bucket',
+                    width=400,
+                    height=400
+                )
+                st.altair_chart(chart, use_container_width=True)
             
             # Debug
             with st.expander('Session Raw Data', expanded=False):
@@ -219,6 +253,46 @@ def main():
         else:
             st.warning("No allocations entered yet.")
 
+    with rollover_tab:
+        st.header(f"Roll Over Allocations into {budget_som.strftime('%B %Y')}")
+        col1, col2 = st.columns(2)
+        with col1:
+            source_date = st.date_input("Source Month", value=previous_month(budget_som))
+        with col2:
+            scale_pct = st.number_input("Scale (%)", min_value=0, max_value=1000, value=100, step=5)
+        overwrite = st.checkbox("Overwrite categories already allocated in the target month", value=False)
+        source_som = source_date.replace(day=1)
+        scale = scale_pct / 100
+
+        # Preview is tied to its parameters so a stale diff is never applied
+        rollover_params = (source_som, budget_som, scale, overwrite)
+        if st.button("Preview Rollover"):
+            st.session_state.rollover_preview = (
+                rollover_params,
+                select_budget_rollover_preview(source_som, budget_som, scale, overwrite, user_id)
+            )
+
+        preview = st.session_state.rollover_preview
+        if preview and preview[0] == rollover_params and preview[1] is not None:
+            rows = preview[1]
+            if not rows:
+                st.warning(f"No allocations found for {source_som.strftime('%B %Y')}.")
+            else:
+                preview_df = pd.DataFrame(rows)
+                preview_df.columns = ["Bucket", "Category", "Source Amount", "New Amount", "Current Amount", "Action"]
+                st.dataframe(preview_df, use_container_width=True)
+                new_total = sum(float(row["new_amount"]) for row in rows if row["rollover_action"] != "skip")
+                st.write(f"Rolled over total: {new_total:,.0f} VND")
+
+                if st.button("Apply Rollover"):
+                    result = rollover_allocations(source_som, budget_som, scale, overwrite, user_id)
+                    if result:
+                        st.session_state.rollover_preview = None
+                        st.success(
+                            f"Rolled over {result['inserted_rows']} new and {result['updated_rows']} updated allocation(s); "
+                            f"removed {result['deleted_rows']} duplicate(s)."
+                        )
+
     # Save all allocations
     if st.button("Save All Allocations"):
         current_category_ids = {item['category_id'] for item in existing_allocations} if existing_allocations else set()
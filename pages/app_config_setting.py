@@ -2,6 +2,7 @@ import streamlit as st
 
 from postgres_operator import PostgresOperator
 from utils import init_connection, check_login
+from dimension_cache import clear_dimensions
 
 db_pool = init_connection()
 db_operator = PostgresOperator(db_pool)
@@ -23,6 +24,7 @@ def insert_categorys(category_name, bucket_id, user_id):
         st.error(f"Failed to record expenses: {error}")
         return False
     else:
+        clear_dimensions()
         return True
     
 def insert_locations(location_name, user_id):
@@ -34,6 +36,7 @@ def insert_locations(location_name, user_id):
         st.error(f"Failed to record expenses: {error}")
         return False
     else:
+        clear_dimensions()
         return True
 
 # Streamlit UI
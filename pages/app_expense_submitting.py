@@ -1,33 +1,37 @@
 import streamlit as st
+import pandas as pd
 from datetime import datetime
 
 from postgres_operator import PostgresOperator
 from utils import init_connection, check_login
+from suggestion_index import build_index
+from dimension_cache import spendable_buckets, spendable_categories_by_bucket, user_locations
 
 # Initialize database connection pool and operator
 db_pool = init_connection()
 db_operator = PostgresOperator(db_pool)
 
 def select_buckets():
-    results, error = db_operator.execute_select('queries/select_buckets_spendable.sql')
-    if error:
-        st.error(f"Failed to fetch buckets: {error}")
+    try:
+        return spendable_buckets()
+    except ConnectionError as e:
+        st.error(f"Failed to fetch buckets: {e}")
         return {}
-    return {row["name"]: row["id"] for row in results} if results else {}
 
-def select_categories(bucket_id, user_id):
-    results, error = db_operator.execute_select('queries/select_categories.sql', (bucket_id, user_id,))
-    if error:
-        st.error(f"Failed to fetch categories: {error}")
+# All categories of the user grouped by bucket, so changing the bucket needs no round trip
+def select_categories_by_bucket(user_id):
+    try:
+        return spendable_categories_by_bucket(user_id)
+    except ConnectionError as e:
+        st.error(f"Failed to fetch categories: {e}")
         return {}
-    return {row['name']: row['id'] for row in results} if results else {}
 
 def select_locations(user_id):
-    results, error = db_operator.execute_select('queries/select_locations.sql', (user_id,))
-    if error:
-        st.error(f"Failed to fetch locations: {error}")
+    try:
+        return user_locations(user_id)
+    except ConnectionError as e:
+        st.error(f"Failed to fetch locations: {e}")
         return {}
-    return {row['name']: row['id'] for row in results} if results else {}
 
 def select_latest_transaction_date(user_id):
     results, error = db_operator.execute_select(
@@ -49,13 +53,140 @@ def insert_expenses(transaction_date, description, amount, category_id, user_id,
         st.error(f"Failed to record expenses: {error}")
         return False
     return True
+
+def insert_expenses_batch(rows, user_id):
+    """Insert all (transaction_date, description, amount, category_id, location_id) rows in one statement."""
+    cash_out_action_id = 4
+    inserted_rows, error = db_operator.execute_insert_many(
+        "queries/insert_expenses_batch.sql",
+        [(transaction_date, description, amount, category_id, cash_out_action_id, user_id, location_id)
+         for transaction_date, description, amount, category_id, location_id in rows],
+        template="(NOW(), %s, %s, %s, %s, %s, %s, %s)"
+    )
+    if inserted_rows != len(rows):
+        st.error(f"Failed to record expenses: {error}")
+        return False
+    return True
+
+# Per-user description index, shared across sessions and updated on every recorded expense
+@st.cache_resource(max_entries=256, show_spinner=False)
+def get_suggestion_index(user_id):
+    results, error = db_operator.execute_select('queries/select_transaction_descriptions.sql', (user_id,))
+    if error:
+        # Raising keeps the failure out of the cache, so the next rerun retries
+        raise ConnectionError(f"Failed to fetch transaction history: {error}")
+    return build_index(results)
+
+def load_suggestion_index(user_id):
+    try:
+        return get_suggestion_index(user_id)
+    except ConnectionError as e:
+        st.error(str(e))
+        return build_index([])
+
+def option_index(options, value):
+    return options.index(value) if value in options else 0
     
 # Initialize session state
 def initialize_session_state():
-    if "bucket_id" not in st.session_state:
-        st.session_state.bucket_id = None
-    if "categories" not in st.session_state:
-        st.session_state.categories = {}
+    if "expense_description" not in st.session_state:
+        st.session_state.expense_description = ""
+    if "recorded_message" not in st.session_state:
+        st.session_state.recorded_message = None
+    # Clear the description after a recorded expense (must happen before the widget is created)
+    if st.session_state.get("reset_description"):
+        st.session_state.expense_description = ""
+        st.session_state.reset_description = False
+    # Bumped after a batch submit so the grid starts empty again
+    if "batch_grid_version" not in st.session_state:
+        st.session_state.batch_grid_version = 0
+    # Default date of new expenses: fetched once per user, then moved forward by the expenses recorded here
+    if st.session_state.get("expense_default_date_user") != st.session_state.user_id:
+        st.session_state.expense_default_date = select_latest_transaction_date(st.session_state.user_id)
+        st.session_state.expense_default_date_user = st.session_state.user_id
+
+def advance_default_date(transaction_date):
+    transaction_date = pd.Timestamp(transaction_date).date()
+    current = st.session_state.expense_default_date
+    st.session_state.expense_default_date = transaction_date if current is None else max(current, transaction_date)
+
+def validate_batch(grid_df, category_options, locations):
+    """
+    Validate grid rows in memory. `category_options` maps each "Bucket / Category" label to
+    (bucket name, category name, category id). Returns (rows to insert, suggestion outcomes, errors).
+    """
+    rows, outcomes, errors = [], [], []
+    for idx, row in grid_df.iterrows():
+        label, location_name = row["Category"], row["Location"]
+        amount, description = row["Amount"], row["Description"]
+        # Untouched rows are skipped
+        if pd.isna(label) and pd.isna(amount) and (pd.isna(description) or not description):
+            continue
+        row_errors = []
+        if pd.isna(row["Date"]):
+            row_errors.append("date is missing")
+        if pd.isna(label) or label not in category_options:
+            row_errors.append("category is missing")
+        if pd.isna(amount) or amount < 1000:
+            row_errors.append("amount must be at least 1,000")
+        if not pd.isna(location_name) and location_name not in locations:
+            row_errors.append(f"unknown location '{location_name}'")
+        if row_errors:
+            errors.append(f"Row {idx + 1}: {', '.join(row_errors)}.")
+            continue
+
+        location_name = None if pd.isna(location_name) else location_name
+        description = "" if pd.isna(description) else description
+        bucket_name, category_name, category_id = category_options[label]
+        rows.append((row["Date"], description, float(amount), category_id, locations.get(location_name)))
+        outcomes.append((description, (bucket_name, category_name, location_name)))
+    return rows, outcomes, errors
+
+def render_batch_entry(user_id, categories, locations, default_date, suggestion_index):
+    st.header("Record Many Expenses")
+    category_options = {
+        f"{bucket_name} / {category_name}": (bucket_name, category_name, category_id)
+        for bucket_name, bucket_categories in categories.items()
+        for category_name, category_id in bucket_categories.items()
+    }
+    empty_grid = pd.DataFrame({
+        "Date": [default_date or datetime.now().date()] * 5,
+        "Category": [None] * 5,
+        "Location": [None] * 5,
+        "Description": [""] * 5,
+        "Amount": [None] * 5,
+    })
+    # Inside a form, cell edits stay in the browser until "Record All": one rerun for the whole batch
+    with st.form("batch_form"):
+        grid_df = st.data_editor(
+            empty_grid,
+            key=f"batch_grid_{st.session_state.batch_grid_version}",
+            num_rows="dynamic",
+            use_container_width=True,
+            column_config={
+                "Date": st.column_config.DateColumn("Date", required=True),
+                "Category": st.column_config.SelectboxColumn("Bucket / Category", options=list(category_options.keys())),
+                "Location": st.column_config.SelectboxColumn("Location", options=list(locations.keys())),
+                "Description": st.column_config.TextColumn("Description"),
+                "Amount": st.column_config.NumberColumn("Amount", min_value=1000, step=1000, format="%d"),
+            },
+        )
+
+        if st.form_submit_button("Record All"):
+            rows, outcomes, errors = validate_batch(grid_df, category_options, locations)
+            if errors:
+                for error in errors:
+                    st.error(error)
+            elif not rows:
+                st.warning("No expenses to record.")
+            elif insert_expenses_batch(rows, user_id):
+                for description, outcome in outcomes:
+                    suggestion_index.add(description, outcome)
+                advance_default_date(max(transaction_date for transaction_date, _, _, _, _ in rows))
+                total = sum(amount for _, _, amount, _, _ in rows)
+                st.session_state.recorded_message = f"Successfully recorded {len(rows)} expenses totalling {total:,.0f}."
+                st.session_state.batch_grid_version += 1
+                st.rerun()
 
 # Streamlit UI
 def main():
@@ -67,45 +198,67 @@ def main():
 
     # Fetch data
     buckets = select_buckets()
+    categories = select_categories_by_bucket(user_id)
     locations = select_locations(user_id)
-    default_date = select_latest_transaction_date(user_id)
+    default_date = st.session_state.expense_default_date
+    suggestion_index = load_suggestion_index(user_id)
 
     st.title("Expense Tracker")
 
-    # Bucket selection (outside the form)   
-    # st.header("Select Bucket")
-    bucket_col, button_col = st.columns([3, 3])
-    with bucket_col:
-        bucket_name = st.selectbox("Bucket", options=list(buckets.keys()))
-    with button_col:
-        if st.button("Select Bucket", key="select_bucket_button"):
-            st.session_state.bucket_id = buckets.get(bucket_name)
-            st.session_state.categories = select_categories(st.session_state.bucket_id, user_id)
+    if st.session_state.recorded_message:
+        st.success(st.session_state.recorded_message)
+        st.session_state.recorded_message = None
 
-    # Form
-    with st.form("expense_form", clear_on_submit=True):
-        st.header("Record New Expense")
-        
-        # Get categories for selected bucket
-        if not st.session_state.categories:
-            st.warning("Please select the bucket first!")
+    entry_mode = st.radio("Entry Mode", options=["Single", "Batch"], horizontal=True)
+    if entry_mode == "Batch":
+        render_batch_entry(user_id, categories, locations, default_date, suggestion_index)
+        return
+
+    st.header("Record New Expense")
+    description = st.text_input("Description", key="expense_description")
+
+    # Suggest bucket, category and location from similar past descriptions
+    suggestions = suggestion_index.suggest(description)
+    suggested_bucket, suggested_category, suggested_location = None, None, None
+    if suggestions:
+        labels = [f"{b} / {c}" + (f" @ {l}" if l else "") + f" ({n}x)" for (b, c, l), n in suggestions]
+        picked = st.radio("Suggestions", options=range(len(suggestions)), format_func=lambda i: labels[i], horizontal=True)
+        suggested_bucket, suggested_category, suggested_location = suggestions[picked][0]
+
+    bucket_col, category_col, location_col = st.columns(3)
+    with bucket_col:
+        bucket_options = list(buckets.keys())
+        bucket_name = st.selectbox("Bucket", options=bucket_options, index=option_index(bucket_options, suggested_bucket))
+    with category_col:
+        bucket_categories = categories.get(bucket_name, {})
+        if not bucket_categories:
+            st.warning("No categories in this bucket!")
             category_name = st.selectbox("Category", ["None"])
             category_id = None
         else:
-            category_name = st.selectbox("Category", options=list(st.session_state.categories.keys()))
-            category_id = st.session_state.categories.get(category_name)
-
-        location_name = st.selectbox("Location", options=list(locations.keys()))
+            category_options = list(bucket_categories.keys())
+            category_name = st.selectbox("Category", options=category_options, index=option_index(category_options, suggested_category))
+            category_id = bucket_categories.get(category_name)
+    with location_col:
+        location_options = list(locations.keys())
+        location_name = st.selectbox("Location", options=location_options, index=option_index(location_options, suggested_location))
         location_id = locations.get(location_name)
-        
+
+    # Form
+    with st.form("expense_form", clear_on_submit=True):
         transaction_date = st.date_input("Date", value=default_date)
-        description = st.text_input("Description")
         amount = st.number_input("Amount", min_value=1000, step=1000)
 
         submitted = st.form_submit_button("Record")
         if submitted:
-            if insert_expenses(transaction_date, description, amount, category_id, user_id, location_id):
-                st.success(f"Successfully recorded: {amount:,.0f} from {category_name} to {location_name} for {description}.")
+            if category_id is None:
+                st.error("Please select a category!")
+            elif insert_expenses(transaction_date, description, amount, category_id, user_id, location_id):
+                suggestion_index.add(description, (bucket_name, category_name, location_name))
+                advance_default_date(transaction_date)
+                st.session_state.recorded_message = f"Successfully recorded: {amount:,.0f} from {category_name} to {location_name} for {description}."
+                st.session_state.reset_description = True
+                st.rerun()
             else:
                 pass
 
@@ -3,6 +3,7 @@ from datetime import datetime
 
 from postgres_operator import PostgresOperator
 from utils import init_connection, check_login
+from session_store import restore_state, persist_state
 
 # Initialize database connection pool and operator
 db_pool = init_connection()
@@ -54,12 +55,9 @@ def insert_income_record(income_date, category_id, user_id, gross_income, paid_d
 
 # Initialize session state
 def initialize_session_state():
-    if "income_records" not in st.session_state:
-        st.session_state.income_records = []
-    if "total_debt" not in st.session_state:
-        st.session_state.total_debt = 0.0
-    if "income_date" not in st.session_state:
-        st.session_state.income_date = None
+    restore_state("income_records", [])
+    restore_state("total_debt", 0.0)
+    restore_state("income_date", None)
 
 # Streamlit App
 def main():
@@ -131,6 +129,7 @@ def main():
                 st.session_state.income_records = income_records
                 st.session_state.total_debt = total_debt
                 st.session_state.income_date = income_date
+                persist_state("income_records", "total_debt", "income_date")
 
                 # Display results for review
                 st.write(f"### Review Net Income for {str(income_date.year)}-{str(income_date.month)}")
@@ -177,6 +176,7 @@ def main():
                 st.session_state.income_records = []
                 st.session_state.total_debt = 0.0
                 st.session_state.income_date = None
+                persist_state("income_records", "total_debt", "income_date")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,59 @@
+import streamlit as st
+import pandas as pd
+
+from utils import check_admin
+from profiler import recent_profiles, clear_profiles
+
+# Streamlit UI
+def main():
+    # Shows every session's reruns, so it is limited to the admins listed in secrets
+    check_admin()
+
+    st.title("Rerun Profiler")
+    st.caption("Open the app with `?profile=1` to time every page render, or `?profile=cprofile` to also capture cProfile output.")
+
+    profiles = recent_profiles()
+    if not profiles:
+        st.info("No profiled reruns yet.")
+        return
+
+    rows = []
+    for profile in profiles:
+        row = {
+            "Time": profile.started_at.strftime("%H:%M:%S"),
+            "Page": profile.page,
+            "Total (ms)": profile.total * 1000,
+        }
+        for phase, elapsed in profile.phases.items():
+            row[f"{phase} (ms)"] = elapsed * 1000
+            row[f"{phase} calls"] = profile.calls[phase]
+        row["other (ms)"] = profile.other * 1000
+        rows.append(row)
+    df = pd.DataFrame(rows).fillna(0)
+
+    st.header("Per-Page Breakdown")
+    timing_columns = [col for col in df.columns if col.endswith("(ms)")]
+    summary_df = df.groupby("Page")[timing_columns].agg(["median", lambda x: x.quantile(0.95)])
+    summary_df.columns = [f"{col} {'p50' if stat == 'median' else 'p95'}" for col, stat in summary_df.columns]
+    summary_df.insert(0, "Reruns", df.groupby("Page").size())
+    st.dataframe(summary_df.round(1), use_container_width=True)
+
+    st.header("Recent Reruns")
+    st.dataframe(df.iloc[::-1].round(1), use_container_width=True)
+
+    captured = [(idx, profile) for idx, profile in enumerate(profiles) if profile.cprofile_stats]
+    if captured:
+        st.header("cProfile Output")
+        selected = st.selectbox(
+            "Rerun",
+            options=[idx for idx, _ in reversed(captured)],
+            format_func=lambda idx: f"{profiles[idx].started_at:%H:%M:%S} - {profiles[idx].page} ({profiles[idx].total * 1000:,.0f} ms)"
+        )
+        st.code(profiles[selected].cprofile_stats)
+
+    if st.button("Clear Profiles"):
+        clear_profiles()
+        st.rerun()
+
+if __name__ == "__main__":
+    main()
@@ -5,21 +5,24 @@ from datetime import datetime
 
 from postgres_operator import PostgresOperator
 from utils import init_connection, check_login
+from fire_simulator import derive_profile, simulate_time_to_fi
+from report_builder import split_report_rows, summarize_report, format_report_rows
+from profiler import profile_phase
 
 # Initialize database connection pool and operator
 db_pool = init_connection()
 db_operator = PostgresOperator(db_pool)
 
-# Fetch budget and expense data for the pivot table
-def fetch_expense_data(user_id, selected_month):
+# Fetch the budget vs. expense report, with bucket subtotals and grand total, computed in SQL
+def fetch_expense_report(user_id, selected_month):
     results, error = db_operator.execute_select(
-        "queries/select_expense_data_by_period.sql",
-        (user_id, selected_month, selected_month,)
+        "queries/select_expense_report_by_period.sql",
+        {"user_id": user_id, "selected_month": selected_month}
     )
     if error:
         st.error(f"Database error: {error}")
         return []
-    return [(row['bucket_name'], row['category_name'], row['action_name'], float(row['amount'])) for row in results]
+    return results
 
 def select_latest_transaction_date(user_id):
     results, error = db_operator.execute_select(
@@ -31,6 +34,158 @@ def select_latest_transaction_date(user_id):
         return None
     return results[0]["latest_transaction_date"] if results else None
 
+# Fetch anomaly and overspend alerts raised by spending_analytics.py
+def fetch_spending_alerts(user_id, selected_month):
+    results, error = db_operator.execute_select(
+        "queries/select_spending_alerts_by_period.sql",
+        (user_id, selected_month,)
+    )
+    if error:
+        st.error(f"Database error: {error}")
+        return []
+    return results
+
+# Fetch current balances per category from the running-balance ledger
+def fetch_current_balances(user_id):
+    results, error = db_operator.execute_select(
+        "queries/select_balance_current.sql",
+        {"user_id": user_id}
+    )
+    if error:
+        st.error(f"Database error: {error}")
+        return []
+    return [(row['bucket_name'], row['category_name'], float(row['balance'])) for row in results]
+
+# Fetch month-end balances per bucket up to the selected month
+def fetch_month_end_balances(user_id, selected_month):
+    results, error = db_operator.execute_select(
+        "queries/select_balance_month_end_by_bucket.sql",
+        (user_id, selected_month,)
+    )
+    if error:
+        st.error(f"Database error: {error}")
+        return []
+    return [(row['balance_month'], row['bucket_name'], float(row['closing_balance'])) for row in results]
+
+def render_balance_sheet_tab(user_id, selected_month, month_str):
+    st.header("Balance Sheet")
+    balances = fetch_current_balances(user_id)
+    if not balances:
+        st.info("No balances found.")
+        return
+
+    df = pd.DataFrame(balances, columns=['Bucket', 'Category', 'Balance'])
+    bucket_df = df.groupby('Bucket', sort=False)['Balance'].sum().reset_index()
+
+    st.subheader("Current Balances")
+    cols = st.columns(len(bucket_df))
+    for col, (bucket_name, balance) in zip(cols, bucket_df.itertuples(index=False)):
+        col.metric(bucket_name, f"{balance:,.0f}")
+
+    display_df = df.copy()
+    display_df['Balance'] = display_df['Balance'].apply(lambda x: f"{x:,.0f}")
+    st.dataframe(display_df, use_container_width=True)
+
+    st.subheader(f"Month-End Balances up to {month_str}")
+    history = fetch_month_end_balances(user_id, selected_month)
+    if history:
+        history_df = pd.DataFrame(history, columns=['Month', 'Bucket', 'Balance'])
+        fig = go.Figure()
+        for bucket_name, bucket_history in history_df.groupby('Bucket', sort=False):
+            fig.add_trace(go.Scatter(x=bucket_history['Month'], y=bucket_history['Balance'], mode="lines+markers", name=bucket_name))
+        fig.update_layout(xaxis_title="Month", yaxis_title="Balance")
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info(f"No balance history found up to {month_str}.")
+
+# Fetch monthly net income and spending history for the FIRE projection
+@st.cache_data(ttl=600, show_spinner=False)
+def fetch_monthly_income_and_spending(user_id):
+    results, error = db_operator.execute_select(
+        "queries/select_monthly_income_and_spending.sql",
+        (user_id, user_id,)
+    )
+    if error:
+        # Raising keeps the failure out of the cache, so the next rerun retries
+        raise ConnectionError(f"Database error: {error}")
+    return results
+
+def load_monthly_income_and_spending(user_id):
+    try:
+        return fetch_monthly_income_and_spending(user_id)
+    except ConnectionError as e:
+        st.error(str(e))
+        return []
+
+# Cached so that unchanged inputs re-render without re-running the simulation
+@st.cache_data(max_entries=32, show_spinner=False)
+def run_fire_simulation(current_portfolio, annual_income, annual_spending_mean, annual_spending_std,
+                        expected_return, return_volatility, inflation_mean, withdrawal_rate, n_paths):
+    return simulate_time_to_fi(
+        current_portfolio=current_portfolio,
+        annual_income=annual_income,
+        annual_spending_mean=annual_spending_mean,
+        annual_spending_std=annual_spending_std,
+        expected_return=expected_return,
+        return_volatility=return_volatility,
+        inflation_mean=inflation_mean,
+        withdrawal_rate=withdrawal_rate,
+        n_paths=n_paths,
+        seed=42,
+    )
+
+def render_fire_tab(user_id):
+    st.header("Financial Independence Projection")
+    profile = derive_profile(load_monthly_income_and_spending(user_id))
+    if not profile:
+        st.info("No income or spending history found to project from.")
+        return
+    if profile['savings_rate'] is None:
+        st.warning("No net income recorded yet, so there are no savings to project from.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Annual Net Income", f"{profile['annual_income']:,.0f}")
+    col2.metric("Annual Spending", f"{profile['annual_spending_mean']:,.0f}")
+    col3.metric("Savings Rate", f"{profile['savings_rate'] * 100:.1f}%")
+    st.caption(f"Derived from {profile['months']} month(s) of history.")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        current_portfolio = st.number_input("Current Portfolio (VND)", min_value=0, step=10_000_000, value=0)
+        expected_return = st.slider("Expected Annual Return (%)", 0.0, 15.0, 7.0, 0.5) / 100
+        return_volatility = st.slider("Return Volatility (%)", 0.0, 30.0, 15.0, 0.5) / 100
+    with col2:
+        inflation_mean = st.slider("Expected Inflation (%)", 0.0, 10.0, 3.5, 0.5) / 100
+        withdrawal_rate = st.slider("Safe Withdrawal Rate (%)", 2.0, 6.0, 4.0, 0.25) / 100
+        n_paths = st.select_slider("Simulated Paths", options=[5_000, 10_000, 20_000, 50_000], value=20_000)
+
+    with profile_phase("simulation"):
+        result = run_fire_simulation(
+            float(current_portfolio), profile['annual_income'], profile['annual_spending_mean'],
+            profile['annual_spending_std'], expected_return, return_volatility, inflation_mean,
+            withdrawal_rate, n_paths,
+        )
+
+    success_by_year = dict(zip(result['years'], result['success_by_year']))
+    col1, col2, col3, col4 = st.columns(4)
+    median_years = result['median_years']
+    col1.metric("Median Years to FI", f"{median_years:.0f}" if median_years is not None else "Never")
+    col2.metric("FI within 10 Years", f"{success_by_year.get(10, 0) * 100:.1f}%")
+    col3.metric("FI within 20 Years", f"{success_by_year.get(20, 0) * 100:.1f}%")
+    col4.metric("FI within 30 Years", f"{success_by_year.get(30, 0) * 100:.1f}%")
+
+    # Distribution of time to FI (paths that never reach FI are left out)
+    reached = result['years_to_fi'][~pd.isna(result['years_to_fi'])]
+    with profile_phase("chart"):
+        fig = go.Figure(go.Histogram(x=reached, xbins=dict(size=1), name="Paths"))
+        fig.update_layout(title="Years to FI Distribution", xaxis_title="Years", yaxis_title="Paths")
+        st.plotly_chart(fig, use_container_width=True)
+
+        fig = go.Figure(go.Scatter(x=result['years'], y=result['success_by_year'] * 100, mode="lines"))
+        fig.update_layout(title="Probability of FI by Year", xaxis_title="Years", yaxis_title="Probability (%)")
+        st.plotly_chart(fig, use_container_width=True)
+
 # Main Streamlit app
 def main():
     check_login()
@@ -45,74 +200,52 @@ def main():
 
     st.title(f"Budget Overview for {month_str}")
 
-    # Create tabs for Expense and other placeholders
-    expense_tab, _, _ = st.tabs(["Expense", "Balance Sheet", "FIRE"])
+    # Create tabs for Expense, Balance Sheet and FIRE
+    expense_tab, balance_tab, fire_tab = st.tabs(["Expense", "Balance Sheet", "FIRE"])
 
     # Expense Tab with Pivot Table
     with expense_tab:
         st.header("Expense Tracking")
-        results = fetch_expense_data(user_id, selected_month)
-        
-        if results:
-            # Create DataFrame
-            df = pd.DataFrame(results, columns=['Bucket', 'Category', 'Action', 'Amount'])
-            
-            # Pivot the data
-            pivot_df = df.pivot_table(
-                index=['Bucket', 'Category'],
-                columns='Action',
-                values='Amount',
-                fill_value=0
-            ).reset_index()
-            
-            # Rename columns based on action names
-            pivot_df.columns.name = None
-            action_map = {name: name for name in pivot_df.columns[2:]}
-            for col in pivot_df.columns[2:]:
-                if 'cash-in' in col.lower():
-                    action_map[col] = 'Budget'
-                elif 'cash-out' in col.lower():
-                    action_map[col] = 'Expenses'
-            pivot_df = pivot_df.rename(columns=action_map)
-            
-            # Ensure Budget and Expenses columns exist
-            if 'Budget' not in pivot_df.columns:
-                pivot_df['Budget'] = 0.0
-            if 'Expenses' not in pivot_df.columns:
-                pivot_df['Expenses'] = 0.0
-            
-            # Calculate Remaining and Percentage Spent
-            pivot_df['Remaining'] = pivot_df['Budget'] + pivot_df['Expenses']
-            pivot_df['Percentage Spent'] = (
-                (abs(pivot_df['Expenses']) / pivot_df['Budget']) * 100
-            ).where(pivot_df['Budget'] > 0, 0)
-            
-            # Format numbers for display
-            display_df = pivot_df.copy()
-            display_df['Budget'] = display_df['Budget'].apply(lambda x: f"{x:,.0f}")
-            display_df['Expenses'] = display_df['Expenses'].apply(lambda x: f"{x:,.0f}")
-            display_df['Remaining'] = display_df['Remaining'].apply(lambda x: f"{x:,.0f}")
-            display_df['Percentage Spent'] = display_df['Percentage Spent'].apply(lambda x: f"{x:.2f}%")
+        results = fetch_expense_report(user_id, selected_month)
+        with profile_phase("transform"):
+            table_rows, total_row = split_report_rows(results or [])
+
+        # ROLLUP always returns the grand total row, so only category rows tell whether there is data
+        if any(row['row_level'] == 'category' for row in table_rows):
+            with profile_phase("transform"):
+                display_rows = format_report_rows(table_rows)
+                summary = summarize_report(total_row)
             
-            # Display pivot table
-            st.dataframe(
-                display_df,
-                use_container_width=True
-            )
+            # Display pivot table with bucket subtotals
+            with profile_phase("render"):
+                st.dataframe(
+                    display_rows,
+                    use_container_width=True
+                )
             
             # Add summary metrics
-            total_budget = pivot_df['Budget'].sum()
-            total_expenses = pivot_df['Expenses'].sum()
-            total_remaining = total_budget + total_expenses
-            percentage_spent = (abs(total_expenses) / total_budget * 100) if total_budget > 0 else 0
             
             col1, col2, col3, col4 = st.columns(4)
-            col1.metric("Total Budget", f"{total_budget:,.0f}")
-            col2.metric("Total Expenses", f"{total_expenses:,.0f}")
-            col3.metric("Total Remaining", f"{total_remaining:,.0f}")
-            col4.metric("Percentage Spent", f"{percentage_spent:.2f}%")
+            col1.metric("Total Budget", f"{summary['total_budget']:,.0f}")
+            col2.metric("Total Expenses", f"{summary['total_expenses']:,.0f}")
+            col3.metric("Total Remaining", f"{summary['total_remaining']:,.0f}")
+            col4.metric("Percentage Spent", f"{summary['percentage_spent']:.2f}%")
         else:
             st.info(f"No expense data found for {month_str}.")
 
+        alerts = fetch_spending_alerts(user_id, selected_month)
+        if alerts:
+            st.subheader("Alerts")
+            for alert in alerts:
+                st.warning(f"**{alert['bucket_name']} / {alert['category_name']}**: {alert['message']}")
+
+    # Balance Sheet Tab with ledger balances
+    with balance_tab:
+        render_balance_sheet_tab(user_id, selected_month, month_str)
+
+    # FIRE Tab with Monte Carlo projection
+    with fire_tab:
+        render_fire_tab(user_id)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,165 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime, timedelta
+
+from postgres_operator import PostgresOperator
+from utils import init_connection, check_login
+from dimension_cache import all_buckets, categories_by_bucket, user_locations
+
+# Initialize database connection pool and operator
+db_pool = init_connection()
+db_operator = PostgresOperator(db_pool)
+
+PAGE_SIZE = 50
+SEARCH_LIMIT = 50
+
+def select_buckets():
+    try:
+        return all_buckets()
+    except ConnectionError as e:
+        st.error(f"Failed to fetch buckets: {e}")
+        return {}
+
+# Every bucket is filterable, so categories of non-spendable buckets (e.g. Income) are listed too
+def select_categories_by_bucket(user_id):
+    try:
+        return categories_by_bucket(user_id)
+    except ConnectionError as e:
+        st.error(f"Failed to fetch categories: {e}")
+        return {}
+
+def select_locations(user_id):
+    try:
+        return user_locations(user_id)
+    except ConnectionError as e:
+        st.error(f"Failed to fetch locations: {e}")
+        return {}
+
+def select_transactions_page(user_id, filters, cursor, limit):
+    """Fetch one page of transactions after `cursor` (transaction_date, id), newest first."""
+    after_date, after_id = cursor if cursor else (None, None)
+    results, error = db_operator.execute_select(
+        'queries/select_transactions_page.sql',
+        {"user_id": user_id, **filters, "after_date": after_date, "after_id": after_id, "limit": limit}
+    )
+    if error:
+        st.error(f"Failed to fetch transactions: {error}")
+        return []
+    return results
+
+def search_transactions(user_id, query, limit):
+    """Ranked full-text and fuzzy search over descriptions and location names."""
+    results, error = db_operator.execute_select(
+        'queries/select_transactions_search.sql',
+        {"user_id": user_id, "q": query, "limit": limit}
+    )
+    if error:
+        st.error(f"Failed to search transactions: {error}")
+        return []
+    return results
+
+def render_transactions(rows):
+    df = pd.DataFrame(rows)
+    df = df[["transaction_date", "bucket_name", "category_name", "location_name", "action_name", "description", "amount"]]
+    df.columns = ["Date", "Bucket", "Category", "Location", "Action", "Description", "Amount"]
+    df["Amount"] = df["Amount"].apply(lambda x: f"{x:,.0f}")
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+# Initialize session state
+def initialize_session_state():
+    # Cursors of the pages visited so far; the last one is the start of the current page
+    if "history_cursors" not in st.session_state:
+        st.session_state.history_cursors = [None]
+    if "history_filters" not in st.session_state:
+        st.session_state.history_filters = None
+
+# Streamlit UI
+def main():
+    check_login()
+    user_id = st.session_state.user_id
+
+    initialize_session_state()
+
+    st.title("Transaction History")
+
+    search_query = st.text_input("Search", placeholder="Search descriptions and locations").strip()
+    if search_query:
+        rows = search_transactions(user_id, search_query, SEARCH_LIMIT)
+        if not rows:
+            st.info(f"No transactions match '{search_query}'.")
+        else:
+            st.caption(f"Top {len(rows)} match(es), best first.")
+            render_transactions(rows)
+        return
+
+    # Filters
+    buckets = select_buckets()
+    categories = select_categories_by_bucket(user_id)
+    locations = select_locations(user_id)
+
+    today = datetime.now().date()
+    default_range = (today - timedelta(days=90), today)
+    col1, col2 = st.columns(2)
+    with col1:
+        date_range = st.date_input("Date Range", value=default_range)
+    with col2:
+        location_name = st.selectbox("Location", options=["All"] + list(locations.keys()))
+    col1, col2 = st.columns(2)
+    with col1:
+        bucket_name = st.selectbox("Bucket", options=["All"] + list(buckets.keys()))
+    with col2:
+        # Across all buckets, names are prefixed with the bucket since two buckets can share a category name
+        category_options = categories.get(bucket_name, {}) if bucket_name != "All" else {
+            f"{bucket} / {name}": cat_id
+            for bucket, bucket_categories in categories.items()
+            for name, cat_id in bucket_categories.items()
+        }
+        category_name = st.selectbox("Category", options=["All"] + list(category_options.keys()))
+
+    # The date range input returns a single date while the user is still picking the end date,
+    # and an empty tuple when it is cleared
+    if len(date_range) == 2:
+        date_from, date_to = date_range
+    elif len(date_range) == 1:
+        date_from, date_to = date_range[0], date_range[0]
+    else:
+        date_from, date_to = default_range
+    filters = {
+        "date_from": date_from,
+        "date_to": date_to,
+        "bucket_id": buckets.get(bucket_name),
+        "category_id": category_options.get(category_name),
+        "location_id": locations.get(location_name),
+    }
+
+    # Changing any filter restarts from the first page
+    if st.session_state.history_filters != filters:
+        st.session_state.history_filters = filters
+        st.session_state.history_cursors = [None]
+
+    cursors = st.session_state.history_cursors
+    # Fetch one extra row to know whether there is a next page
+    rows = select_transactions_page(user_id, filters, cursors[-1], PAGE_SIZE + 1)
+    has_next = len(rows) > PAGE_SIZE
+    rows = rows[:PAGE_SIZE]
+
+    if not rows:
+        st.info("No transactions found.")
+    else:
+        render_transactions(rows)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("Previous", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        st.caption(f"Page {len(cursors)}")
+    with col3:
+        if st.button("Next", disabled=not has_next):
+            last = rows[-1]
+            cursors.append((last["transaction_date"], last["id"]))
+            st.rerun()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Query plan regression checks for every named query in queries/.
+
+Runs EXPLAIN (ANALYZE, BUFFERS) for each query against a seeded local database and records its plan shape,
+estimated vs. actual rows and buffer counts. Each query runs in a transaction that is rolled back, so writes
+are measured but never kept.
+
+Usage:
+    python plan_check.py --seed --users 50 --transactions-per-user 20000
+    python plan_check.py --record
+    python plan_check.py --check --seq-scan-tables fact_transaction,fact_balance_ledger --buffer-threshold 0.5
+
+Parameters for each query come from query_plans/params.json; `$name` values are replaced with ids of the seeded
+plan_user_1 and with dates relative to today. `--check` exits with status 1 when any regression is found.
+
+Database credentials are read from the environment (or a .env file): DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from utils import connect
+
+QUERIES_DIR = "queries"
+PLANS_DIR = "query_plans"
+PARAMS_PATH = os.path.join(PLANS_DIR, "params.json")
+BASELINE_PATH = os.path.join(PLANS_DIR, "baseline.json")
+# DDL and maintenance scripts are not part of the query layer
+SKIPPED_PREFIXES = ("create_", "rebuild_")
+
+def read_query(query_path):
+    with open(query_path, "r") as f:
+        query = f.read().strip()
+        if not query:
+            raise ValueError(f"Query '{query_path}' not found.")
+    return query.rstrip(";")
+
+def add_months(month, months):
+    total = month.year * 12 + month.month - 1 + months
+    return date(total // 12, total % 12 + 1, 1)
+
+def fixture_values(conn):
+    """Values for the `$name` placeholders in params.json."""
+    with conn, conn.cursor() as cursor:
+        cursor.execute(read_query(os.path.join(PLANS_DIR, "select_fixture_ids.sql")))
+        row = cursor.fetchone()
+        if row is None:
+            raise SystemExit("No seeded data found; run `python plan_check.py --seed` first.")
+        values = dict(zip([desc[0] for desc in cursor.description], row))
+    today = date.today()
+    month = today.replace(day=1)
+    values.update({
+        "today": today,
+        "month": month,
+        "previous_month": add_months(month, -1),
+        "baseline_month": add_months(month, -6),
+        "date_from": today - timedelta(days=90),
+    })
+    return values
+
+def resolve(value, fixtures):
+    if isinstance(value, str) and value.startswith("$"):
+        return fixtures[value[1:]]
+    if isinstance(value, list):
+        return [resolve(item, fixtures) for item in value]
+    if isinstance(value, dict):
+        return {key: resolve(item, fixtures) for key, item in value.items()}
+    return value
+
+def walk_plan(node, depth=0):
+    """Yield (depth, node) for every node of a JSON plan, parents first."""
+    yield depth, node
+    for child in node.get("Plans", []):
+        yield from walk_plan(child, depth + 1)
+
+def summarize_plan(plan):
+    """Reduce EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) output to what the checks compare."""
+    root = plan["Plan"]
+    nodes, node_types, seq_scans = [], {}, []
+    worst_misestimate, worst_node = 1.0, None
+    for depth, node in walk_plan(root):
+        label = node["Node Type"] + (f" on {node['Relation Name']}" if "Relation Name" in node else "")
+        nodes.append("  " * depth + label)
+        node_types[node["Node Type"]] = node_types.get(node["Node Type"], 0) + 1
+        if node["Node Type"] == "Seq Scan":
+            seq_scans.append(node["Relation Name"])
+        # Actual rows are per loop; nodes that never ran have nothing to compare
+        if node.get("Actual Loops", 0) == 0:
+            continue
+        estimated = max(node["Plan Rows"], 1)
+        actual = max(node["Actual Rows"] * node["Actual Loops"], 1)
+        ratio = max(estimated / actual, actual / estimated)
+        if ratio > worst_misestimate:
+            worst_misestimate, worst_node = ratio, label
+    return {
+        "shape": nodes,
+        "node_types": node_types,
+        "seq_scans": sorted(set(seq_scans)),
+        "estimated_rows": root["Plan Rows"],
+        "actual_rows": root["Actual Rows"] * root["Actual Loops"],
+        "worst_misestimate": round(worst_misestimate, 2),
+        "worst_misestimate_node": worst_node,
+        "shared_buffers": root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0),
+        "execution_ms": round(plan["Execution Time"], 2),
+    }
+
+def explain(conn, query_path, params):
+    """EXPLAIN ANALYZE one query inside a transaction that is always rolled back."""
+    query = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + read_query(query_path)
+    try:
+        with conn.cursor() as cursor:
+            if isinstance(params, dict) and "values" in params:
+                # Multi-row `VALUES %s` statements, expanded the same way as PostgresOperator.execute_insert_many
+                rows = execute_values(cursor, query, params["values"], template=params.get("template"), fetch=True)
+            else:
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+    finally:
+        conn.rollback()
+    plan = rows[0][0]
+    return summarize_plan((json.loads(plan) if isinstance(plan, str) else plan)[0])
+
+def explain_all(conn):
+    """Return ({query name: plan summary}, {query name: error})."""
+    with open(PARAMS_PATH, "r") as f:
+        all_params = json.load(f)
+    fixtures = fixture_values(conn)
+
+    plans, errors = {}, {}
+    for query_path in sorted(glob.glob(os.path.join(QUERIES_DIR, "*.sql"))):
+        name = os.path.basename(query_path)
+        if name.startswith(SKIPPED_PREFIXES):
+            continue
+        if name not in all_params:
+            errors[name] = f"No parameters in {PARAMS_PATH}."
+            continue
+        try:
+            plans[name] = explain(conn, query_path, resolve(all_params[name], fixtures))
+        except (psycopg2.Error, KeyError, ValueError) as e:
+            errors[name] = str(e).strip()
+    return plans, errors
+
+def compare(baseline, current, seq_scan_tables, buffer_threshold, min_buffers, max_misestimate):
+    """Return (regressions, notes) as lists of (query name, message)."""
+    regressions, notes = [], []
+    for name, plan in sorted(current.items()):
+        old = baseline.get(name)
+
+        # Seq scans on large tables are regressions unless the baseline already had them
+        old_seq_scans = set(old["seq_scans"]) if old else set()
+        for table in plan["seq_scans"]:
+            if table in seq_scan_tables and table not in old_seq_scans:
+                regressions.append((name, f"new Seq Scan on {table}"))
+
+        if max_misestimate and plan["worst_misestimate"] > max_misestimate:
+            regressions.append((name, (
+                f"rows misestimated {plan['worst_misestimate']:.0f}x at {plan['worst_misestimate_node']} "
+                f"(limit {max_misestimate:.0f}x)"
+            )))
+
+        if old is None:
+            notes.append((name, "not in baseline"))
+            continue
+
+        old_nested = old["node_types"].get("Nested Loop", 0)
+        new_nested = plan["node_types"].get("Nested Loop", 0)
+        if new_nested > old_nested:
+            regressions.append((name, f"Nested Loop count went from {old_nested} to {new_nested}"))
+
+        growth = plan["shared_buffers"] - old["shared_buffers"]
+        if growth > min_buffers and growth > old["shared_buffers"] * buffer_threshold:
+            regressions.append((name, (
+                f"shared buffers went from {old['shared_buffers']} to {plan['shared_buffers']} "
+                f"(+{growth / max(old['shared_buffers'], 1):.0%})"
+            )))
+
+        if plan["shape"] != old["shape"]:
+            notes.append((name, "plan shape changed:\n      " + "\n      ".join(plan["shape"])))
+
+    for name in sorted(set(baseline) - set(current)):
+        notes.append((name, "in baseline but not checked"))
+    return regressions, notes
+
+def seed(conn, users, categories_per_bucket, locations_per_user, months, transactions_per_user):
+    with conn, conn.cursor() as cursor:
+        cursor.execute(read_query(os.path.join(PLANS_DIR, "seed.sql")), {
+            "users": users,
+            "categories_per_bucket": categories_per_bucket,
+            "locations_per_user": locations_per_user,
+            "months": months,
+            "transactions_per_user": transactions_per_user,
+        })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EXPLAIN-based regression checks for the queries in queries/.")
+    parser.add_argument("--seed", action="store_true", help="Seed plan_user_* data at the sizes below first.")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--categories-per-bucket", type=int, default=4)
+    parser.add_argument("--locations-per-user", type=int, default=20)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--transactions-per-user", type=int, default=20000)
+    parser.add_argument("--record", action="store_true", help=f"Write the current plans to {BASELINE_PATH}.")
+    parser.add_argument("--check", action="store_true", help="Compare the current plans with the baseline.")
+    parser.add_argument("--seq-scan-tables", default="fact_transaction",
+                        help="Comma-separated tables on which a new Seq Scan is a regression.")
+    parser.add_argument("--buffer-threshold", type=float, default=0.5,
+                        help="Relative shared-buffer increase that counts as a regression.")
+    parser.add_argument("--min-buffers", type=int, default=100,
+                        help="Ignore buffer increases smaller than this many blocks.")
+    parser.add_argument("--max-misestimate", type=float, default=0,
+                        help="Fail when estimated and actual rows differ by more than this factor (0 disables).")
+    args = parser.parse_args()
+
+    if not (args.seed or args.record or args.check):
+        parser.error("Nothing to do: pass --seed, --record and/or --check.")
+
+    conn = connect()
+    try:
+        if args.seed:
+            seed(conn, args.users, args.categories_per_bucket, args.locations_per_user, args.months,
+                 args.transactions_per_user)
+            print(f"Seeded {args.users} plan user(s).")
+        if not (args.record or args.check):
+            sys.exit(0)
+        plans, errors = explain_all(conn)
+    finally:
+        conn.close()
+
+    for name, error in sorted(errors.items()):
+        print(f"ERROR {name}: {error}")
+
+    if args.record:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(plans, f, indent=2, sort_keys=True)
+        print(f"Recorded {len(plans)} plan(s) to {BASELINE_PATH}.")
+
+    if args.check:
+        if not os.path.exists(BASELINE_PATH):
+            raise SystemExit(f"No baseline at {BASELINE_PATH}; run with --record first.")
+        with open(BASELINE_PATH, "r") as f:
+            baseline = json.load(f)
+        seq_scan_tables = {table.strip() for table in args.seq_scan_tables.split(",") if table.strip()}
+        regressions, notes = compare(
+            baseline, plans, seq_scan_tables, args.buffer_threshold, args.min_buffers, args.max_misestimate
+        )
+        for name, message in notes:
+            print(f"NOTE {name}: {message}")
+        for name, message in regressions:
+            print(f"REGRESSION {name}: {message}")
+        print(f"Checked {len(plans)} plan(s): {len(regressions)} regression(s), {len(errors)} error(s).")
+        if regressions or errors:
+            sys.exit(1)
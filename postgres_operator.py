@@ -1,5 +1,69 @@
+import threading
+from contextlib import contextmanager
 import psycopg2
+import psycopg2.errors
+from psycopg2.extras import execute_values
 from utils import get_db_connection, release_connection, init_connection
+from profiler import profiled
+from workload import (
+    WORKLOAD_CLASSES, QueryCancelledError, QueryTimeoutError, QueryToken, WorkloadBusyError,
+    register_query, unregister_query, workload_for,
+)
+
+# Rerun-scoped memo of SELECT results. Each Streamlit script run executes on its own thread,
+# so the memo is thread-local and only active between begin_rerun() and the next write.
+_rerun_memo = threading.local()
+_memo_stats_lock = threading.Lock()
+_memo_stats = {"hits": 0, "misses": 0}
+
+def _memo_key(query_path, params):
+    """Build a hashable key from the query name and its parameters, or None if params are unhashable."""
+    if isinstance(params, dict):
+        params = tuple(sorted(params.items()))
+    elif isinstance(params, list):
+        params = tuple(params)
+    try:
+        hash(params)
+    except TypeError:
+        return None
+    return (query_path, params)
+
+def _read_query(query_path):
+    with open(query_path, "r") as f:
+        query = f.read().strip()
+        if not query:
+            raise ValueError(f"Query '{query_path}' not found.")
+    return query
+
+class Transaction:
+    """Cursor wrapper running queries from .sql files inside one transaction. Errors are raised, not returned."""
+    def __init__(self, cursor, workload):
+        self.cursor = cursor
+        self.workload = workload
+        self._timeout_set = False
+
+    def _query(self, query_path):
+        # The statement_timeout is sent with the first statement and lasts for the whole transaction
+        query = _read_query(query_path)
+        if self._timeout_set:
+            return query
+        self._timeout_set = True
+        return self.workload.timed(query)
+
+    def select(self, query_path, params=None):
+        self.cursor.execute(self._query(query_path), params)
+        columns = [desc[0] for desc in self.cursor.description]
+        return [dict(zip(columns, row)) for row in self.cursor.fetchall()]
+
+    def execute(self, query_path, params=None):
+        self.cursor.execute(self._query(query_path), params)
+        return self.cursor.rowcount
+
+    def execute_many(self, query_path, rows, template=None):
+        if not rows:
+            return 0
+        execute_values(self.cursor, self._query(query_path), rows, template=template, page_size=len(rows))
+        return self.cursor.rowcount
 
 class PostgresOperator:
     """
@@ -7,70 +71,169 @@ class PostgresOperator:
     def __init__(self, db_pool):
         self.db_pool = db_pool
 
+    @staticmethod
+    def begin_rerun():
+        """Start a fresh memo for the current script run. Call once at the top of every rerun."""
+        _rerun_memo.results = {}
+        _rerun_memo.hits = 0
+        _rerun_memo.misses = 0
+
+    @staticmethod
+    def clear_memo():
+        """Drop memoized results of the current script run (called on any write)."""
+        if getattr(_rerun_memo, "results", None) is not None:
+            _rerun_memo.results.clear()
+
+    @staticmethod
+    def memo_stats():
+        """Return memo hit/miss counters for the current run and since the process started."""
+        with _memo_stats_lock:
+            total = dict(_memo_stats)
+        return {
+            "run_hits": getattr(_rerun_memo, "hits", 0),
+            "run_misses": getattr(_rerun_memo, "misses", 0),
+            "total_hits": total["hits"],
+            "total_misses": total["misses"],
+        }
+
+    @staticmethod
+    def _record_memo(hit):
+        if hit:
+            _rerun_memo.hits += 1
+        else:
+            _rerun_memo.misses += 1
+        with _memo_stats_lock:
+            _memo_stats["hits" if hit else "misses"] += 1
+
     def execute_select(self, query_path, params=None):
-        """Execute a SELECT query from a .sql file and return results as a list of dicts."""
-        with open(query_path, 'r') as f:
-            query = f.read().strip()
-            if not query:
-                raise ValueError(f"Query '{query_path}' not found.")
-
-        # Get connection from pool
-        conn = get_db_connection(self.db_pool)
-        if not conn:
-            raise ConnectionError("Failed to get database connection.")
+        """Execute a SELECT query from a .sql file and return results as a list of dicts.
+        Within a script run, identical (query, params) reads are served from the rerun memo."""
+        memo = getattr(_rerun_memo, "results", None)
+        key = _memo_key(query_path, params) if memo is not None else None
+        if key is not None:
+            if key in memo:
+                self._record_memo(hit=True)
+                return [dict(row) for row in memo[key]], None
+            self._record_memo(hit=False)
+
+        result, error = self._execute_select(query_path, params)
+        if key is not None and error is None:
+            memo[key] = result
+            result = [dict(row) for row in result]
+        return result, error
+
+    @contextmanager
+    def _connection(self, workload, cancellable=False):
+        """
+        Borrow a pooled connection within the concurrency limit of `workload`. Queries must be sent with
+        `workload.timed()` to apply its statement_timeout. A `cancellable` query (reads only) is cancelled if
+        the Streamlit rerun that issued it is superseded.
+        """
+        if not workload.acquire():
+            raise WorkloadBusyError(f"Too many {workload.name} queries running; please try again.")
         try:
-            with conn:
-                with conn.cursor() as cursor:
-                    cursor.execute(query, params)
-                    columns = [desc[0] for desc in cursor.description]
-                    result = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                    return result, None
+            conn = get_db_connection(self.db_pool)
+            if not conn:
+                raise ConnectionError("Failed to get database connection.")
+            token = register_query(conn, workload) if cancellable else QueryToken()
+            try:
+                yield conn
+            except psycopg2.errors.QueryCanceled as e:
+                if token.cancelled:
+                    raise QueryCancelledError("Query cancelled: the page was rerun before it finished.") from e
+                workload.count("timed_out")
+                raise QueryTimeoutError(
+                    f"Query took longer than {workload.statement_timeout_ms / 1000:g}s ({workload.name} limit)."
+                ) from e
+            finally:
+                unregister_query(token)
+                release_connection(self.db_pool, conn)
+        finally:
+            workload.release()
+
+    @profiled("db")
+    def _execute_select(self, query_path, params=None):
+        query = _read_query(query_path)
+        workload = workload_for(query_path)
+        try:
+            with self._connection(workload, cancellable=True) as conn:
+                with conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute(workload.timed(query), params)
+                        columns = [desc[0] for desc in cursor.description]
+                        result = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                        return result, None
         except Exception as e:
             return None, str(e)
-        finally:
-            release_connection(self.db_pool, conn)
 
+    @profiled("db")
     def execute_insert(self, query_path, params=None):
         """Execute an INSERT query from .sql file and return the number of affected rows."""
-        with open(query_path, "r") as f:
-            query = f.read().strip()
-            if not query:
-                raise ValueError(f"Query '{query_path}' not found.")
-            
-        conn = get_db_connection(self.db_pool)
-        if not conn:
-            raise ConnectionError("Failed to get database connection.")
+        self.clear_memo()
+        query = _read_query(query_path)
+        workload = workload_for(query_path)
         try:
-            with conn:
-                with conn.cursor() as cursor:
-                    cursor.execute(query, params)
-                    conn.commit()
-                    return cursor.rowcount, None
+            with self._connection(workload) as conn:
+                with conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute(workload.timed(query), params)
+                        conn.commit()
+                        return cursor.rowcount, None
         except Exception as e:
             return 0, str(e)
-        finally:
-            release_connection(self.db_pool, conn)
 
-    def execute_query(self, query, params=None, fetch=False):
-        """Execute a SQL query. If fetch is True, return results as list of dicts."""
-        conn = get_db_connection(self.db_pool)
-        if not conn:
-            raise ConnectionError("Failed to get database connection.")
+    @profiled("db")
+    def execute_insert_many(self, query_path, rows, template=None):
+        """Insert many rows with a single multi-row INSERT (`VALUES %s` in the .sql file) in one transaction.
+        Returns the number of inserted rows."""
+        self.clear_memo()
+        query = _read_query(query_path)
+        if not rows:
+            return 0, None
+
+        workload = workload_for(query_path)
         try:
-            with conn:
-                with conn.cursor() as cursor:
-                    cursor.execute(query, params)
-                    if fetch:
-                        columns = [desc[0] for desc in cursor.description]
-                        result = [dict(zip(columns, row)) for row in cursor.fetchall()]
-                        return result, None
-                    else:
+            with self._connection(workload) as conn:
+                with conn:
+                    with conn.cursor() as cursor:
+                        # page_size covers all rows so they are sent as one statement
+                        execute_values(cursor, workload.timed(query), rows, template=template, page_size=len(rows))
                         conn.commit()
                         return cursor.rowcount, None
+        except Exception as e:
+            return 0, str(e)
+
+    @contextmanager
+    def transaction(self, workload="interactive"):
+        """Run several queries in one transaction: commits when the block exits, rolls back on error.
+        All queries share the statement_timeout and concurrency limit of the `workload` class."""
+        self.clear_memo()
+        workload = WORKLOAD_CLASSES[workload]
+        with self._connection(workload) as conn:
+            with conn:
+                with conn.cursor() as cursor:
+                    yield Transaction(cursor, workload)
+
+    @profiled("db")
+    def execute_query(self, query, params=None, fetch=False, workload="interactive"):
+        """Execute a SQL query. If fetch is True, return results as list of dicts."""
+        if not fetch:
+            self.clear_memo()
+        workload = WORKLOAD_CLASSES[workload]
+        try:
+            with self._connection(workload, cancellable=fetch) as conn:
+                with conn:
+                    with conn.cursor() as cursor:
+                        cursor.execute(workload.timed(query), params)
+                        if fetch:
+                            columns = [desc[0] for desc in cursor.description]
+                            result = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                            return result, None
+                        else:
+                            conn.commit()
+                            return cursor.rowcount, None
         except Exception as e:
             return None if fetch else 0, str(e)
-        finally:
-            release_connection(self.db_pool, conn)
 
 if __name__ == "__main__":
     db_pool = init_connection()
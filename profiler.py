@@ -0,0 +1,92 @@
+import cProfile
+import functools
+import io
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+# Profile of the script run executing on the current thread (None when profiling is off)
+_current = threading.local()
+# Rolling store of the most recent profiled reruns, shared by all sessions
+_store_lock = threading.Lock()
+_store = deque(maxlen=200)
+
+class RerunProfile:
+    """Timings of one page render, broken down by phase (db, transform, chart, ...)."""
+    def __init__(self, page):
+        self.page = page
+        self.started_at = datetime.now()
+        self.total = 0.0
+        self.phases = {}
+        self.calls = {}
+        self.cprofile_stats = None
+
+    def add(self, phase, elapsed):
+        self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    @property
+    def other(self):
+        """Time not attributed to any phase: widget emission, session state and Python overhead."""
+        return max(self.total - sum(self.phases.values()), 0.0)
+
+@contextmanager
+def profile_rerun(page, enabled=False, capture_cprofile=False, top_n=40):
+    """Profile one page render and append it to the rolling store. A no-op unless `enabled`."""
+    if not enabled:
+        yield None
+        return
+
+    profile = RerunProfile(page)
+    _current.profile = profile
+    profiler = cProfile.Profile() if capture_cprofile else None
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield profile
+    finally:
+        # Also runs when the page calls st.rerun() or st.stop(), which raise control-flow exceptions
+        if profiler:
+            profiler.disable()
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top_n)
+            profile.cprofile_stats = stream.getvalue()
+        profile.total = time.perf_counter() - start
+        _current.profile = None
+        with _store_lock:
+            _store.append(profile)
+
+@contextmanager
+def profile_phase(name):
+    """Attribute the time spent in the block to `name` in the current rerun profile, if any."""
+    profile = getattr(_current, "profile", None)
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, time.perf_counter() - start)
+
+def profiled(name):
+    """Decorator form of profile_phase."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def recent_profiles():
+    with _store_lock:
+        return list(_store)
+
+def clear_profiles():
+    with _store_lock:
+        _store.clear()
@@ -0,0 +1,11 @@
+-- Externalized Streamlit session state: one row per session key, so keys load lazily
+CREATE TABLE IF NOT EXISTS app_session (
+    session_id TEXT NOT NULL,
+    state_key TEXT NOT NULL,
+    state_value BYTEA NOT NULL,
+    created_time TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_time TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (session_id, state_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_app_session_updated_time ON app_session (updated_time);
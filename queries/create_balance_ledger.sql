@@ -0,0 +1,61 @@
+-- Running-balance ledger: net change per user, category and month, maintained by trigger on fact_transaction
+CREATE TABLE IF NOT EXISTS fact_balance_ledger (
+    user_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    balance_month DATE NOT NULL,
+    net_change NUMERIC NOT NULL DEFAULT 0,
+    updated_time TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (user_id, category_id, balance_month)
+);
+
+-- Month-end closing balances, written periodically so current balances only add the months after them
+CREATE TABLE IF NOT EXISTS fact_balance_checkpoint (
+    user_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    checkpoint_month DATE NOT NULL,
+    closing_balance NUMERIC NOT NULL,
+    updated_time TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (user_id, category_id, checkpoint_month)
+);
+
+CREATE OR REPLACE FUNCTION apply_balance_change(
+    p_user_id INTEGER, p_category_id INTEGER, p_transaction_date DATE, p_amount NUMERIC, p_action_id INTEGER
+) RETURNS VOID AS $$
+DECLARE
+    v_month DATE := DATE_TRUNC('month', p_transaction_date)::date;
+BEGIN
+    IF p_category_id IS NULL OR p_user_id IS NULL THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO fact_balance_ledger (user_id, category_id, balance_month, net_change, updated_time)
+    SELECT p_user_id, p_category_id, v_month, p_amount * a.multiply_factor, NOW()
+    FROM dim_action AS a
+    WHERE a.id = p_action_id
+    ON CONFLICT (user_id, category_id, balance_month)
+    DO UPDATE SET 
+        net_change = fact_balance_ledger.net_change + EXCLUDED.net_change,
+        updated_time = NOW();
+
+    -- Checkpoints at or after a changed month are no longer valid
+    DELETE FROM fact_balance_checkpoint
+    WHERE user_id = p_user_id AND category_id = p_category_id AND checkpoint_month >= v_month;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION maintain_balance_ledger() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_balance_change(OLD.user_id, OLD.category_id, OLD.transaction_date::date, -OLD.amount, OLD.action_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_balance_change(NEW.user_id, NEW.category_id, NEW.transaction_date::date, NEW.amount, NEW.action_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_maintain_balance_ledger ON fact_transaction;
+CREATE TRIGGER trg_maintain_balance_ledger
+AFTER INSERT OR UPDATE OR DELETE ON fact_transaction
+FOR EACH ROW EXECUTE FUNCTION maintain_balance_ledger();
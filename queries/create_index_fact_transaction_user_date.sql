@@ -0,0 +1,3 @@
+-- Supports keyset pagination of a user's transactions on (transaction_date, id)
+CREATE INDEX IF NOT EXISTS idx_fact_transaction_user_date_id
+ON fact_transaction (user_id, transaction_date DESC, id DESC);
@@ -0,0 +1,80 @@
+-- Incremental spending analytics state (see spending_analytics.py)
+CREATE TABLE IF NOT EXISTS agg_category_month_spend (
+    user_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    spend_month DATE NOT NULL,
+    spend NUMERIC NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    updated_time TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (user_id, category_id, spend_month)
+);
+
+-- Running sums of expense amounts per category, for transaction-level z-scores
+CREATE TABLE IF NOT EXISTS agg_category_amount_stats (
+    user_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    amount_sum NUMERIC NOT NULL DEFAULT 0,
+    amount_sumsq NUMERIC NOT NULL DEFAULT 0,
+    updated_time TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (user_id, category_id)
+);
+
+CREATE TABLE IF NOT EXISTS fact_spending_alert (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    alert_month DATE NOT NULL,
+    alert_type TEXT NOT NULL,
+    transaction_id INTEGER,
+    metric NUMERIC,
+    message TEXT NOT NULL,
+    updated_time TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_fact_spending_alert
+ON fact_spending_alert (user_id, category_id, alert_month, alert_type, (COALESCE(transaction_id, 0)));
+
+-- Expenses not yet folded into the aggregates, fed by a trigger on fact_transaction. A queued row becomes
+-- visible only when the inserting transaction commits, so expenses committed late are never skipped
+-- (an id watermark would skip a lower id committed after a higher one had been processed).
+-- Only inserts are queued: the aggregates are running sums, and expenses are never edited or deleted by the app.
+-- After changing expenses in the database directly, run `python spending_analytics.py --rebuild`.
+CREATE TABLE IF NOT EXISTS spending_analytics_queue (
+    transaction_id INTEGER PRIMARY KEY,
+    queued_time TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE OR REPLACE FUNCTION enqueue_spending_analytics() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO spending_analytics_queue (transaction_id)
+    VALUES (NEW.id)
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- First install only: create the trigger, then queue the existing expenses.
+-- CREATE TRIGGER waits for in-flight inserts and blocks new ones until commit, so none falls in between.
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgname = 'trg_enqueue_spending_analytics' AND tgrelid = 'fact_transaction'::regclass
+    ) THEN
+        CREATE TRIGGER trg_enqueue_spending_analytics
+        AFTER INSERT ON fact_transaction
+        FOR EACH ROW
+        WHEN (NEW.action_id = 4 AND NEW.category_id IS NOT NULL)
+        EXECUTE FUNCTION enqueue_spending_analytics();
+
+        INSERT INTO spending_analytics_queue (transaction_id)
+        SELECT t.id
+        FROM fact_transaction AS t
+        WHERE 
+            t.action_id = 4
+            AND t.category_id IS NOT NULL
+        ON CONFLICT DO NOTHING;
+    END IF;
+END;
+$$;
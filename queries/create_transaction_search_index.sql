@@ -0,0 +1,11 @@
+-- Full-text and trigram indexes backing queries/select_transactions_search.sql
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_fact_transaction_description_tsv
+ON fact_transaction USING GIN (to_tsvector('simple', COALESCE(description, '')));
+
+CREATE INDEX IF NOT EXISTS idx_fact_transaction_description_trgm
+ON fact_transaction USING GIN (COALESCE(description, '') gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_dim_location_name_trgm
+ON dim_location USING GIN (location_name gin_trgm_ops);
@@ -0,0 +1,12 @@
+-- Drops stale checkpoints; balance reads then fall back to an earlier checkpoint or the full ledger
+DELETE FROM fact_balance_checkpoint AS cp
+WHERE 
+    (%(user_id)s IS NULL OR cp.user_id = %(user_id)s)
+    AND cp.closing_balance <> (
+        SELECT COALESCE(SUM(l.net_change), 0)
+        FROM fact_balance_ledger AS l
+        WHERE 
+            l.user_id = cp.user_id
+            AND l.category_id = cp.category_id
+            AND l.balance_month <= cp.checkpoint_month
+    );
@@ -0,0 +1,9 @@
+DELETE FROM app_session
+WHERE session_id IN (
+    SELECT session_id
+    FROM app_session
+    GROUP BY session_id
+    HAVING 
+        MAX(updated_time) <= NOW() - MAKE_INTERVAL(secs => %(idle_timeout_s)s)
+        OR MIN(created_time) <= NOW() - MAKE_INTERVAL(secs => %(max_age_s)s)
+);
@@ -0,0 +1,8 @@
+-- Month-level alerts of the rescored (user, category, month) keys; transaction alerts are kept
+DELETE FROM fact_spending_alert AS a
+USING (VALUES %s) AS k (user_id, category_id, alert_month)
+WHERE 
+    a.user_id = k.user_id
+    AND a.category_id = k.category_id
+    AND a.alert_month = k.alert_month::date
+    AND a.alert_type IN ('unusual_month', 'overspent', 'projected_overspend');
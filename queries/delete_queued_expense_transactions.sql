@@ -0,0 +1,21 @@
+-- Claims the next queued expenses. The queue rows are deleted in the caller's transaction,
+-- so they are queued again if the run fails before committing.
+WITH claimed AS (
+    DELETE FROM spending_analytics_queue
+    WHERE transaction_id IN (
+        SELECT transaction_id
+        FROM spending_analytics_queue
+        ORDER BY transaction_id
+        LIMIT %(limit)s
+    )
+    RETURNING transaction_id
+)
+SELECT 
+    t.id AS transaction_id,
+    t.user_id,
+    t.category_id,
+    t.transaction_date,
+    t.amount
+FROM claimed AS c
+JOIN fact_transaction AS t ON t.id = c.transaction_id
+ORDER BY t.id;
@@ -0,0 +1,2 @@
+DELETE FROM app_session
+WHERE session_id = %s;
@@ -0,0 +1,16 @@
+INSERT INTO fact_balance_checkpoint (user_id, category_id, checkpoint_month, closing_balance, updated_time)
+SELECT 
+    l.user_id,
+    l.category_id,
+    %(checkpoint_month)s::date,
+    SUM(l.net_change),
+    NOW()
+FROM fact_balance_ledger AS l
+WHERE 
+    l.balance_month <= %(checkpoint_month)s::date
+    AND (%(user_id)s IS NULL OR l.user_id = %(user_id)s)
+GROUP BY l.user_id, l.category_id
+ON CONFLICT (user_id, category_id, checkpoint_month)
+DO UPDATE SET 
+    closing_balance = EXCLUDED.closing_balance,
+    updated_time = NOW();
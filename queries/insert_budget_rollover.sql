@@ -0,0 +1,59 @@
+WITH source AS (
+    SELECT t.category_id, ROUND(SUM(t.amount) * %(scale)s) AS amount
+    FROM fact_transaction AS t
+    WHERE 
+        t.action_id = 3
+        AND t.user_id = %(user_id)s
+        AND t.transaction_date = %(source_month)s
+    GROUP BY t.category_id
+),
+target AS (
+    SELECT 
+        t.id, 
+        t.category_id,
+        ROW_NUMBER() OVER (PARTITION BY t.category_id ORDER BY t.id) AS category_row
+    FROM fact_transaction AS t
+    WHERE 
+        t.action_id = 3
+        AND t.user_id = %(user_id)s
+        AND t.transaction_date = %(target_month)s
+),
+-- Overwriting leaves one allocation per category at the new amount, matching the preview's total
+updated AS (
+    UPDATE fact_transaction AS t
+    SET 
+        amount = s.amount,
+        updated_time = NOW(),
+        description = %(description)s
+    FROM target AS tg
+    JOIN source AS s ON s.category_id = tg.category_id
+    WHERE 
+        %(overwrite)s
+        AND t.id = tg.id
+        AND tg.category_row = 1
+    RETURNING t.id
+),
+deleted AS (
+    DELETE FROM fact_transaction AS t
+    USING target AS tg
+    JOIN source AS s ON s.category_id = tg.category_id
+    WHERE 
+        %(overwrite)s
+        AND t.id = tg.id
+        AND tg.category_row > 1
+    RETURNING t.id
+),
+inserted AS (
+    INSERT INTO fact_transaction (
+        updated_time, transaction_date, description, amount, 
+        category_id, action_id, user_id
+    )
+    SELECT NOW(), %(target_month)s, %(description)s, s.amount, s.category_id, 3, %(user_id)s
+    FROM source AS s
+    WHERE NOT EXISTS (SELECT 1 FROM target AS tg WHERE tg.category_id = s.category_id)
+    RETURNING id
+)
+SELECT 
+    (SELECT COUNT(*) FROM inserted) AS inserted_rows,
+    (SELECT COUNT(*) FROM updated) AS updated_rows,
+    (SELECT COUNT(*) FROM deleted) AS deleted_rows;
@@ -0,0 +1,4 @@
+INSERT INTO fact_transaction (
+    updated_time, transaction_date, description, amount, 
+    category_id, action_id, user_id, location_id
+) VALUES %s;
@@ -0,0 +1,17 @@
+DELETE FROM fact_balance_checkpoint WHERE (%(user_id)s IS NULL OR user_id = %(user_id)s);
+
+DELETE FROM fact_balance_ledger WHERE (%(user_id)s IS NULL OR user_id = %(user_id)s);
+
+INSERT INTO fact_balance_ledger (user_id, category_id, balance_month, net_change, updated_time)
+SELECT 
+    t.user_id,
+    t.category_id,
+    DATE_TRUNC('month', t.transaction_date)::date AS balance_month,
+    SUM(t.amount * a.multiply_factor) AS net_change,
+    NOW()
+FROM fact_transaction AS t
+JOIN dim_action AS a ON a.id = t.action_id
+WHERE 
+    t.category_id IS NOT NULL
+    AND (%(user_id)s IS NULL OR t.user_id = %(user_id)s)
+GROUP BY 1, 2, 3;
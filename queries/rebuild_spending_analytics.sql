@@ -0,0 +1,10 @@
+TRUNCATE agg_category_month_spend, agg_category_amount_stats, fact_spending_alert, spending_analytics_queue;
+
+-- Queue every expense again; expenses still being inserted are queued by the trigger when they commit
+INSERT INTO spending_analytics_queue (transaction_id)
+SELECT t.id
+FROM fact_transaction AS t
+WHERE 
+    t.action_id = 4
+    AND t.category_id IS NOT NULL
+ON CONFLICT DO NOTHING;
@@ -0,0 +1,10 @@
+SELECT 
+    t.user_id,
+    t.category_id,
+    t.transaction_date AS spend_month,
+    SUM(t.amount) AS allocation
+FROM fact_transaction AS t
+JOIN unnest(%(user_ids)s::int[], %(category_ids)s::int[], %(months)s::date[]) AS k(user_id, category_id, spend_month)
+    ON k.user_id = t.user_id AND k.category_id = t.category_id AND k.spend_month = t.transaction_date
+WHERE t.action_id = 3
+GROUP BY 1, 2, 3;
@@ -0,0 +1,4 @@
+SELECT s.user_id, s.category_id, s.transaction_count, s.amount_sum, s.amount_sumsq
+FROM agg_category_amount_stats AS s
+JOIN unnest(%(user_ids)s::int[], %(category_ids)s::int[]) AS k(user_id, category_id)
+    ON k.user_id = s.user_id AND k.category_id = s.category_id;
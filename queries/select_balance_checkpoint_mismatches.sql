@@ -0,0 +1,17 @@
+-- Checkpoints whose closing balance no longer equals the ledger up to their month (e.g. a backdated write
+-- committed concurrently with the checkpoint, so the trigger could not see and delete it)
+SELECT 
+    cp.user_id,
+    cp.category_id,
+    cp.checkpoint_month,
+    cp.closing_balance,
+    COALESCE(SUM(l.net_change), 0) AS ledger_balance
+FROM fact_balance_checkpoint AS cp
+LEFT JOIN fact_balance_ledger AS l 
+    ON l.user_id = cp.user_id
+    AND l.category_id = cp.category_id
+    AND l.balance_month <= cp.checkpoint_month
+WHERE (%(user_id)s IS NULL OR cp.user_id = %(user_id)s)
+GROUP BY cp.user_id, cp.category_id, cp.checkpoint_month, cp.closing_balance
+HAVING cp.closing_balance <> COALESCE(SUM(l.net_change), 0)
+ORDER BY 1, 2, 3;
@@ -0,0 +1,23 @@
+WITH latest_checkpoint AS (
+    SELECT DISTINCT ON (cp.category_id)
+        cp.category_id,
+        cp.checkpoint_month,
+        cp.closing_balance
+    FROM fact_balance_checkpoint AS cp
+    WHERE cp.user_id = %(user_id)s
+    ORDER BY cp.category_id, cp.checkpoint_month DESC
+)
+SELECT 
+    b.bucket_name,
+    c.category_name,
+    COALESCE(lc.closing_balance, 0) + COALESCE(SUM(l.net_change), 0) AS balance
+FROM dim_category AS c
+JOIN dim_bucket AS b ON b.id = c.bucket_id
+LEFT JOIN latest_checkpoint AS lc ON lc.category_id = c.id
+LEFT JOIN fact_balance_ledger AS l 
+    ON l.user_id = %(user_id)s
+    AND l.category_id = c.id
+    AND (lc.checkpoint_month IS NULL OR l.balance_month > lc.checkpoint_month)
+WHERE c.user_id = %(user_id)s
+GROUP BY b.id, b.bucket_name, c.id, c.category_name, lc.closing_balance
+ORDER BY b.id, c.id;
@@ -0,0 +1,31 @@
+WITH expected AS (
+    SELECT 
+        t.user_id,
+        t.category_id,
+        DATE_TRUNC('month', t.transaction_date)::date AS balance_month,
+        SUM(t.amount * a.multiply_factor) AS net_change
+    FROM fact_transaction AS t
+    JOIN dim_action AS a ON a.id = t.action_id
+    WHERE 
+        t.category_id IS NOT NULL
+        AND (%(user_id)s IS NULL OR t.user_id = %(user_id)s)
+    GROUP BY 1, 2, 3
+),
+actual AS (
+    SELECT user_id, category_id, balance_month, net_change
+    FROM fact_balance_ledger
+    WHERE (%(user_id)s IS NULL OR user_id = %(user_id)s)
+)
+SELECT 
+    COALESCE(e.user_id, l.user_id) AS user_id,
+    COALESCE(e.category_id, l.category_id) AS category_id,
+    COALESCE(e.balance_month, l.balance_month) AS balance_month,
+    COALESCE(e.net_change, 0) AS expected_net_change,
+    COALESCE(l.net_change, 0) AS ledger_net_change
+FROM expected AS e
+FULL OUTER JOIN actual AS l 
+    ON l.user_id = e.user_id 
+    AND l.category_id = e.category_id 
+    AND l.balance_month = e.balance_month
+WHERE COALESCE(e.net_change, 0) <> COALESCE(l.net_change, 0)
+ORDER BY 1, 2, 3;
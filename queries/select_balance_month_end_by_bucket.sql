@@ -0,0 +1,12 @@
+SELECT 
+    l.balance_month,
+    b.bucket_name,
+    SUM(SUM(l.net_change)) OVER (PARTITION BY b.id ORDER BY l.balance_month) AS closing_balance
+FROM fact_balance_ledger AS l
+JOIN dim_category AS c ON c.id = l.category_id
+JOIN dim_bucket AS b ON b.id = c.bucket_id
+WHERE 
+    l.user_id = %s
+    AND l.balance_month <= %s
+GROUP BY l.balance_month, b.id, b.bucket_name
+ORDER BY l.balance_month, b.id;
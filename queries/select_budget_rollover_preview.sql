@@ -0,0 +1,34 @@
+WITH source AS (
+    SELECT t.category_id, SUM(t.amount) AS source_amount
+    FROM fact_transaction AS t
+    WHERE 
+        t.action_id = 3
+        AND t.user_id = %(user_id)s
+        AND t.transaction_date = %(source_month)s
+    GROUP BY t.category_id
+),
+target AS (
+    SELECT t.category_id, SUM(t.amount) AS target_amount
+    FROM fact_transaction AS t
+    WHERE 
+        t.action_id = 3
+        AND t.user_id = %(user_id)s
+        AND t.transaction_date = %(target_month)s
+    GROUP BY t.category_id
+)
+SELECT 
+    b.bucket_name,
+    c.category_name,
+    s.source_amount,
+    ROUND(s.source_amount * %(scale)s) AS new_amount,
+    tg.target_amount,
+    CASE 
+        WHEN tg.category_id IS NULL THEN 'insert'
+        WHEN %(overwrite)s THEN 'update'
+        ELSE 'skip'
+    END AS rollover_action
+FROM source AS s
+JOIN dim_category AS c ON c.id = s.category_id
+JOIN dim_bucket AS b ON b.id = c.bucket_id
+LEFT JOIN target AS tg ON tg.category_id = s.category_id
+ORDER BY b.id, c.id;
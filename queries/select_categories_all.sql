@@ -0,0 +1,8 @@
+SELECT 
+    b.bucket_name,
+    c.category_name AS name,
+    c.id
+FROM dim_category AS c
+JOIN dim_bucket AS b ON b.id = c.bucket_id
+WHERE c.user_id = %s
+ORDER BY b.id, c.id;
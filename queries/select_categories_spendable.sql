@@ -0,0 +1,10 @@
+SELECT 
+    b.bucket_name,
+    c.category_name AS name,
+    c.id
+FROM dim_category AS c
+JOIN dim_bucket AS b ON b.id = c.bucket_id
+WHERE 
+    c.user_id = %s
+    AND b.bucket_type IN ('Expense', 'Saving', 'Investing')
+ORDER BY b.id, c.id;
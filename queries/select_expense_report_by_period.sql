@@ -0,0 +1,35 @@
+-- Budget vs. expenses per category, with bucket subtotals and a grand total (ROLLUP),
+-- ready to render: row_level is 'category', 'bucket' (subtotal) or 'total'
+WITH totals AS (
+    SELECT 
+        b.bucket_name,
+        c.category_name,
+        GROUPING(b.bucket_name) AS bucket_grouping,
+        GROUPING(c.category_name) AS category_grouping,
+        COALESCE(SUM(t.amount * a.multiply_factor) FILTER (WHERE t.action_id = 3), 0) AS budget,
+        COALESCE(SUM(t.amount * a.multiply_factor) FILTER (WHERE t.action_id = 4), 0) AS expenses
+    FROM fact_transaction AS t
+    LEFT JOIN dim_category AS c ON c.id = t.category_id
+    LEFT JOIN dim_bucket AS b ON b.id = c.bucket_id
+    LEFT JOIN dim_action AS a ON a.id = t.action_id
+    WHERE 
+        b.bucket_type = 'Expense'
+        AND t.user_id = %(user_id)s
+        AND t.transaction_date >= %(selected_month)s
+        AND t.transaction_date < %(selected_month)s + INTERVAL '1 month'
+    GROUP BY ROLLUP (b.bucket_name, c.category_name)
+)
+SELECT 
+    CASE 
+        WHEN bucket_grouping = 1 THEN 'total'
+        WHEN category_grouping = 1 THEN 'bucket'
+        ELSE 'category'
+    END AS row_level,
+    bucket_name,
+    category_name,
+    budget,
+    expenses,
+    budget + expenses AS remaining,
+    CASE WHEN budget > 0 THEN ABS(expenses) / budget * 100 ELSE 0 END AS percentage_spent
+FROM totals
+ORDER BY bucket_grouping, bucket_name, category_grouping, category_name;
@@ -0,0 +1,2 @@
+-- Held until the transaction ends; concurrent rollovers into the same (user, month) run one after the other
+SELECT pg_advisory_xact_lock(hashtext('budget_rollover'), hashtext(%(user_id)s::text || ':' || %(target_month)s::text));
@@ -0,0 +1,6 @@
+SELECT m.user_id, m.category_id, m.spend_month, m.spend
+FROM agg_category_month_spend AS m
+JOIN unnest(%(user_ids)s::int[], %(category_ids)s::int[]) AS k(user_id, category_id)
+    ON k.user_id = m.user_id AND k.category_id = m.category_id
+WHERE m.spend_month >= %(since_month)s
+ORDER BY m.user_id, m.category_id, m.spend_month;
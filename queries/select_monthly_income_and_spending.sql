@@ -0,0 +1,28 @@
+WITH income AS (
+    SELECT 
+        DATE_TRUNC('month', i.income_date)::date AS month,
+        SUM(i.net_income) AS net_income
+    FROM fact_income AS i
+    WHERE i.user_id = %s
+    GROUP BY 1
+),
+spending AS (
+    SELECT 
+        DATE_TRUNC('month', t.transaction_date)::date AS month,
+        SUM(t.amount) AS spending
+    FROM fact_transaction AS t
+    LEFT JOIN dim_category AS c ON c.id = t.category_id
+    LEFT JOIN dim_bucket AS b ON b.id = c.bucket_id
+    WHERE 
+        t.user_id = %s
+        AND t.action_id = 4
+        AND b.bucket_type = 'Expense'
+    GROUP BY 1
+)
+SELECT 
+    COALESCE(i.month, s.month) AS month,
+    COALESCE(i.net_income, 0) AS net_income,
+    COALESCE(s.spending, 0) AS spending
+FROM income AS i
+FULL OUTER JOIN spending AS s ON s.month = i.month
+ORDER BY 1;
@@ -0,0 +1,3 @@
+SELECT state_value
+FROM app_session
+WHERE session_id = %s AND state_key = %s;
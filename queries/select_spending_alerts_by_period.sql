@@ -0,0 +1,13 @@
+SELECT 
+    a.alert_type,
+    b.bucket_name,
+    c.category_name,
+    a.message,
+    a.updated_time
+FROM fact_spending_alert AS a
+JOIN dim_category AS c ON c.id = a.category_id
+JOIN dim_bucket AS b ON b.id = c.bucket_id
+WHERE 
+    a.user_id = %s
+    AND a.alert_month = %s
+ORDER BY a.updated_time DESC;
@@ -0,0 +1,15 @@
+SELECT 
+    t.description,
+    b.bucket_name,
+    c.category_name,
+    l.location_name,
+    COUNT(*) AS frequency
+FROM fact_transaction AS t
+JOIN dim_category AS c ON c.id = t.category_id
+JOIN dim_bucket AS b ON b.id = c.bucket_id
+LEFT JOIN dim_location AS l ON l.id = t.location_id
+WHERE 
+    t.user_id = %s
+    AND t.action_id = 4
+    AND COALESCE(t.description, '') <> ''
+GROUP BY 1, 2, 3, 4;
@@ -0,0 +1,25 @@
+SELECT 
+    t.id,
+    t.transaction_date,
+    b.bucket_name,
+    c.category_name,
+    l.location_name,
+    a.action_name,
+    t.description,
+    t.amount * a.multiply_factor AS amount
+FROM fact_transaction AS t
+JOIN dim_action AS a ON a.id = t.action_id
+LEFT JOIN dim_category AS c ON c.id = t.category_id
+LEFT JOIN dim_bucket AS b ON b.id = c.bucket_id
+LEFT JOIN dim_location AS l ON l.id = t.location_id
+WHERE 
+    t.user_id = %(user_id)s
+    AND t.transaction_date >= %(date_from)s
+    AND t.transaction_date <= %(date_to)s
+    AND (%(bucket_id)s IS NULL OR c.bucket_id = %(bucket_id)s)
+    AND (%(category_id)s IS NULL OR t.category_id = %(category_id)s)
+    AND (%(location_id)s IS NULL OR t.location_id = %(location_id)s)
+    -- Keyset (seek) pagination: continue strictly after the last row of the previous page
+    AND (%(after_date)s IS NULL OR (t.transaction_date, t.id) < (%(after_date)s, %(after_id)s))
+ORDER BY t.transaction_date DESC, t.id DESC
+LIMIT %(limit)s;
@@ -0,0 +1,53 @@
+-- Each candidate branch matches one index; the OR is resolved by UNION instead of a scan
+WITH search AS (
+    SELECT 
+        websearch_to_tsquery('simple', %(q)s) AS tsq,
+        %(q)s::text AS q
+),
+matched_locations AS (
+    SELECT l.id, word_similarity(s.q, l.location_name) AS location_score
+    FROM dim_location AS l, search AS s
+    WHERE 
+        l.user_id = %(user_id)s
+        AND s.q <%% l.location_name
+),
+candidates AS (
+    SELECT t.id
+    FROM fact_transaction AS t, search AS s
+    WHERE 
+        t.user_id = %(user_id)s
+        AND to_tsvector('simple', COALESCE(t.description, '')) @@ s.tsq
+    UNION
+    SELECT t.id
+    FROM fact_transaction AS t, search AS s
+    WHERE 
+        t.user_id = %(user_id)s
+        AND s.q <%% COALESCE(t.description, '')
+    UNION
+    SELECT t.id
+    FROM fact_transaction AS t
+    JOIN matched_locations AS ml ON ml.id = t.location_id
+)
+SELECT 
+    t.id,
+    t.transaction_date,
+    b.bucket_name,
+    c.category_name,
+    l.location_name,
+    a.action_name,
+    t.description,
+    t.amount * a.multiply_factor AS amount,
+    ts_rank(to_tsvector('simple', COALESCE(t.description, '')), s.tsq)
+        + word_similarity(s.q, COALESCE(t.description, ''))
+        + COALESCE(ml.location_score, 0) AS rank
+FROM candidates AS cd
+JOIN fact_transaction AS t ON t.id = cd.id
+JOIN dim_action AS a ON a.id = t.action_id
+LEFT JOIN dim_category AS c ON c.id = t.category_id
+LEFT JOIN dim_bucket AS b ON b.id = c.bucket_id
+LEFT JOIN dim_location AS l ON l.id = t.location_id
+LEFT JOIN matched_locations AS ml ON ml.id = t.location_id
+CROSS JOIN search AS s
+WHERE t.user_id = %(user_id)s
+ORDER BY rank DESC, t.transaction_date DESC, t.id DESC
+LIMIT %(limit)s;
@@ -0,0 +1,2 @@
+-- Held until the transaction ends; concurrent runs skip instead of double counting
+SELECT pg_try_advisory_xact_lock(hashtext('spending_analytics')) AS locked;
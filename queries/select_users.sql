@@ -0,0 +1,3 @@
+SELECT id AS user_id, username
+FROM dim_user
+ORDER BY id;
@@ -0,0 +1,7 @@
+-- Moves a session's state to a new id; the session's age restarts with the login that rotated it
+UPDATE app_session
+SET 
+    session_id = %(new_session_id)s,
+    created_time = NOW(),
+    updated_time = NOW()
+WHERE session_id = %(session_id)s;
@@ -0,0 +1,10 @@
+-- The owner row is written at login and touched on every rerun, so its times are the session's start and last use.
+-- Returns the owner only while the session has been neither idle nor alive for longer than the limits.
+UPDATE app_session
+SET updated_time = NOW()
+WHERE 
+    session_id = %(session_id)s
+    AND state_key = %(owner_key)s
+    AND updated_time > NOW() - MAKE_INTERVAL(secs => %(idle_timeout_s)s)
+    AND created_time > NOW() - MAKE_INTERVAL(secs => %(max_age_s)s)
+RETURNING state_value;
@@ -0,0 +1,9 @@
+INSERT INTO agg_category_amount_stats AS s (
+    user_id, category_id, transaction_count, amount_sum, amount_sumsq, updated_time
+) VALUES %s
+ON CONFLICT (user_id, category_id)
+DO UPDATE SET 
+    transaction_count = s.transaction_count + EXCLUDED.transaction_count,
+    amount_sum = s.amount_sum + EXCLUDED.amount_sum,
+    amount_sumsq = s.amount_sumsq + EXCLUDED.amount_sumsq,
+    updated_time = NOW();
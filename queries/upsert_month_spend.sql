@@ -0,0 +1,8 @@
+INSERT INTO agg_category_month_spend AS m (
+    user_id, category_id, spend_month, spend, transaction_count, updated_time
+) VALUES %s
+ON CONFLICT (user_id, category_id, spend_month)
+DO UPDATE SET 
+    spend = m.spend + EXCLUDED.spend,
+    transaction_count = m.transaction_count + EXCLUDED.transaction_count,
+    updated_time = NOW();
@@ -0,0 +1,6 @@
+INSERT INTO app_session (session_id, state_key, state_value, updated_time)
+VALUES (%s, %s, %s, NOW())
+ON CONFLICT (session_id, state_key)
+DO UPDATE SET 
+    state_value = EXCLUDED.state_value,
+    updated_time = NOW();
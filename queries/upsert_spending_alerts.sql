@@ -0,0 +1,8 @@
+INSERT INTO fact_spending_alert AS a (
+    user_id, category_id, alert_month, alert_type, transaction_id, metric, message, updated_time
+) VALUES %s
+ON CONFLICT (user_id, category_id, alert_month, alert_type, (COALESCE(transaction_id, 0)))
+DO UPDATE SET 
+    metric = EXCLUDED.metric,
+    message = EXCLUDED.message,
+    updated_time = NOW();
@@ -0,0 +1,87 @@
+-- Seeds plan_user_* users with a realistic data volume for plan_check.py.
+-- Assumes the schema and the dim_bucket / dim_action reference rows exist. Safe to re-run: seeded users are skipped.
+INSERT INTO dim_user (username, password)
+SELECT 'plan_user_' || u, 'plan'
+FROM generate_series(1, %(users)s) AS u
+WHERE NOT EXISTS (SELECT 1 FROM dim_user WHERE username = 'plan_user_' || u);
+
+INSERT INTO dim_category (updated_time, category_name, bucket_id, user_id)
+SELECT NOW(), b.bucket_name || ' ' || n, b.id, u.id
+FROM dim_user AS u
+CROSS JOIN dim_bucket AS b
+CROSS JOIN generate_series(1, %(categories_per_bucket)s) AS n
+WHERE 
+    u.username LIKE 'plan\_user\_%%'
+    AND NOT EXISTS (SELECT 1 FROM dim_category AS c WHERE c.user_id = u.id);
+
+INSERT INTO dim_location (updated_time, location_name, user_id)
+SELECT NOW(), 'Location ' || n, u.id
+FROM dim_user AS u
+CROSS JOIN generate_series(1, %(locations_per_user)s) AS n
+WHERE 
+    u.username LIKE 'plan\_user\_%%'
+    AND NOT EXISTS (SELECT 1 FROM dim_location AS l WHERE l.user_id = u.id);
+
+INSERT INTO fact_income (updated_time, income_date, category_id, user_id, gross_income, paid_debt, net_income)
+SELECT NOW(), (DATE_TRUNC('month', CURRENT_DATE) - (m || ' month')::interval)::date, c.id, u.id, 30000000, 0, 30000000
+FROM dim_user AS u
+JOIN dim_category AS c ON c.user_id = u.id
+JOIN dim_bucket AS b ON b.id = c.bucket_id AND b.bucket_name = 'Income'
+CROSS JOIN generate_series(0, %(months)s - 1) AS m
+WHERE 
+    u.username LIKE 'plan\_user\_%%'
+    AND NOT EXISTS (SELECT 1 FROM fact_income AS i WHERE i.user_id = u.id);
+
+WITH categories AS (
+    SELECT 
+        c.id, 
+        c.user_id,
+        ROW_NUMBER() OVER (PARTITION BY c.user_id ORDER BY c.id) AS rn,
+        COUNT(*) OVER (PARTITION BY c.user_id) AS cnt
+    FROM dim_category AS c
+    JOIN dim_bucket AS b ON b.id = c.bucket_id
+    WHERE b.bucket_type IN ('Expense', 'Saving', 'Investing')
+),
+locations AS (
+    SELECT 
+        l.id,
+        l.user_id,
+        ROW_NUMBER() OVER (PARTITION BY l.user_id ORDER BY l.id) AS rn,
+        COUNT(*) OVER (PARTITION BY l.user_id) AS cnt
+    FROM dim_location AS l
+),
+seed_rows AS (
+    SELECT 
+        u.id AS user_id,
+        g,
+        CASE WHEN random() < 0.1 THEN 3 ELSE 4 END AS action_id,
+        CURRENT_DATE - (random() * (%(months)s * 30))::int AS transaction_date,
+        random() AS r_category,
+        random() AS r_location,
+        random() AS r_amount,
+        random() AS r_description
+    FROM dim_user AS u
+    CROSS JOIN generate_series(1, %(transactions_per_user)s) AS g
+    WHERE 
+        u.username LIKE 'plan\_user\_%%'
+        AND NOT EXISTS (SELECT 1 FROM fact_transaction AS t WHERE t.user_id = u.id)
+)
+INSERT INTO fact_transaction (
+    updated_time, transaction_date, description, amount, 
+    category_id, action_id, user_id, location_id
+)
+SELECT 
+    NOW(),
+    CASE WHEN r.action_id = 3 THEN DATE_TRUNC('month', r.transaction_date)::date ELSE r.transaction_date END,
+    (ARRAY['Pho bo', 'Grab bike', 'Coffee', 'Market', 'Electric bill', 'Water bill', 'Netflix', 'Gas', 'Lunch', 'Books'])
+        [1 + FLOOR(r.r_description * 10)::int] || ' ' || (r.g %% 50),
+    (1 + FLOOR(r.r_amount * 500)) * 1000,
+    c.id,
+    r.action_id,
+    r.user_id,
+    CASE WHEN r.action_id = 4 THEN l.id END
+FROM seed_rows AS r
+JOIN categories AS c ON c.user_id = r.user_id AND c.rn = 1 + FLOOR(r.r_category * c.cnt)
+JOIN locations AS l ON l.user_id = r.user_id AND l.rn = 1 + FLOOR(r.r_location * l.cnt);
+
+ANALYZE;
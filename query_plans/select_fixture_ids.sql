@@ -0,0 +1,16 @@
+-- Ids substituted for the $placeholders in params.json
+SELECT 
+    u.id AS user_id,
+    u.username,
+    c.id AS category_id,
+    c.bucket_id,
+    l.id AS location_id,
+    t.id AS transaction_id
+FROM dim_user AS u
+JOIN dim_category AS c ON c.user_id = u.id
+JOIN dim_bucket AS b ON b.id = c.bucket_id AND b.bucket_type = 'Expense'
+JOIN dim_location AS l ON l.user_id = u.id
+JOIN fact_transaction AS t ON t.user_id = u.id AND t.category_id = c.id
+WHERE u.username = 'plan_user_1'
+ORDER BY c.id, l.id, t.id
+LIMIT 1;
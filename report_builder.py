@@ -0,0 +1,48 @@
+# Shared by the Streamlit reporting page and the headless batch reports (no Streamlit dependency).
+# The pivot, bucket subtotals and grand total come ready from queries/select_expense_report_by_period.sql.
+
+REPORT_COLUMNS = ['Bucket', 'Category', 'Budget', 'Expenses', 'Remaining', 'Percentage Spent']
+
+def split_report_rows(results):
+    """Split report rows into the table rows (categories and bucket subtotals) and the grand total row."""
+    table_rows = [row for row in results if row['row_level'] != 'total']
+    total_row = next((row for row in results if row['row_level'] == 'total'), None)
+    return table_rows, total_row
+
+def summarize_report(total_row):
+    """Return the total budget, expenses, remaining and percentage spent from the grand total row."""
+    if total_row is None:
+        return {"total_budget": 0.0, "total_expenses": 0.0, "total_remaining": 0.0, "percentage_spent": 0.0}
+    return {
+        "total_budget": float(total_row['budget']),
+        "total_expenses": float(total_row['expenses']),
+        "total_remaining": float(total_row['remaining']),
+        "percentage_spent": float(total_row['percentage_spent']),
+    }
+
+def numeric_report_rows(table_rows):
+    """Report rows with numeric values, for file exports."""
+    return [
+        {
+            'Bucket': row['bucket_name'],
+            'Category': row['category_name'] if row['row_level'] == 'category' else 'Subtotal',
+            'Budget': float(row['budget']),
+            'Expenses': float(row['expenses']),
+            'Remaining': float(row['remaining']),
+            'Percentage Spent': float(row['percentage_spent']),
+        }
+        for row in table_rows
+    ]
+
+def format_report_rows(table_rows):
+    """Format report rows for display; bucket subtotal rows are labelled 'Subtotal'."""
+    return [
+        {
+            **row,
+            'Budget': f"{row['Budget']:,.0f}",
+            'Expenses': f"{row['Expenses']:,.0f}",
+            'Remaining': f"{row['Remaining']:,.0f}",
+            'Percentage Spent': f"{row['Percentage Spent']:.2f}%",
+        }
+        for row in numeric_report_rows(table_rows)
+    ]
@@ -0,0 +1,268 @@
+import json
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+
+import psycopg2
+import streamlit as st
+
+from postgres_operator import PostgresOperator
+from utils import init_connection
+
+# Session state kept outside the Streamlit process, so any app replica can serve any session.
+# The session id travels in the `sid` query parameter, so it is not a credential: login status is never stored,
+# and stored state is only restored for the user who logged in to this Streamlit session and owns the session.
+# Sessions expire after an idle timeout and a maximum age, and a new id is issued at every login.
+
+SESSION_ID_PARAM = "sid"
+IDLE_TIMEOUT_S = 12 * 3600
+MAX_AGE_S = 7 * 24 * 3600
+# Kept only in st.session_state
+AUTH_KEYS = ("logged_in", "username", "user_id")
+# Stored key holding the user id of the session's owner; its row tracks the session's start and last use
+OWNER_KEY = "_owner"
+_MISSING = object()
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"__decimal__": str(value)}
+    if isinstance(value, tuple):
+        return {"__tuple__": [_encode(item) for item in value]}
+    if isinstance(value, list):
+        return [_encode(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    return value
+
+def _decode(value):
+    if isinstance(value, list):
+        return [_decode(item) for item in value]
+    if isinstance(value, dict):
+        if "__datetime__" in value:
+            return datetime.fromisoformat(value["__datetime__"])
+        if "__date__" in value:
+            return date.fromisoformat(value["__date__"])
+        if "__decimal__" in value:
+            return Decimal(value["__decimal__"])
+        if "__tuple__" in value:
+            return tuple(_decode(item) for item in value["__tuple__"])
+        return {key: _decode(item) for key, item in value.items()}
+    return value
+
+def serialize(value):
+    """Compact JSON (dates, decimals and tuples preserved), zlib-compressed."""
+    return zlib.compress(json.dumps(_encode(value), separators=(",", ":")).encode("utf-8"))
+
+def deserialize(payload):
+    return _decode(json.loads(zlib.decompress(bytes(payload)).decode("utf-8")))
+
+class PostgresSessionStore:
+    """Session store in the app_session table (see queries/create_app_session.sql)."""
+    def __init__(self, db_operator, idle_timeout_s=IDLE_TIMEOUT_S, max_age_s=MAX_AGE_S):
+        self.db_operator = db_operator
+        self.limits = {"idle_timeout_s": idle_timeout_s, "max_age_s": max_age_s}
+
+    def touch(self, session_id):
+        """
+        Mark an active session as used now and return its owner's user id, or None once it has expired.
+        Database errors are raised, so a failed check is not mistaken for an expired session.
+        """
+        with self.db_operator.transaction() as tx:
+            results = tx.select(
+                'queries/update_session_last_seen.sql',
+                {"session_id": session_id, "owner_key": OWNER_KEY, **self.limits}
+            )
+        return deserialize(results[0]["state_value"]) if results else None
+
+    def get(self, session_id, key, default=None):
+        results, error = self.db_operator.execute_select('queries/select_session_value.sql', (session_id, key,))
+        if error or not results:
+            return default
+        return deserialize(results[0]["state_value"])
+
+    def set(self, session_id, key, value):
+        _, error = self.db_operator.execute_insert(
+            'queries/upsert_session_value.sql',
+            (session_id, key, psycopg2.Binary(serialize(value)))
+        )
+        return error is None
+
+    def rename(self, session_id, new_session_id):
+        self.db_operator.execute_insert(
+            'queries/update_session_id.sql', {"session_id": session_id, "new_session_id": new_session_id}
+        )
+
+    def delete(self, session_id):
+        self.db_operator.execute_insert('queries/delete_session.sql', (session_id,))
+
+    def purge_expired(self):
+        self.db_operator.execute_insert('queries/delete_expired_sessions.sql', self.limits)
+
+class LocalSessionStore:
+    """Key-value stand-in backed by a local SQLite file, shared by app processes on the same machine."""
+    def __init__(self, path="sessions.db", idle_timeout_s=IDLE_TIMEOUT_S, max_age_s=MAX_AGE_S):
+        self.idle_timeout_s = idle_timeout_s
+        self.max_age_s = max_age_s
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            # Times are Unix timestamps
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS app_session ("
+                "session_id TEXT NOT NULL, state_key TEXT NOT NULL, state_value BLOB NOT NULL, "
+                "created_time REAL NOT NULL, updated_time REAL NOT NULL, "
+                "PRIMARY KEY (session_id, state_key))"
+            )
+
+    def touch(self, session_id):
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT state_value FROM app_session "
+                "WHERE session_id = ? AND state_key = ? AND updated_time > ? AND created_time > ?",
+                (session_id, OWNER_KEY, now - self.idle_timeout_s, now - self.max_age_s)
+            ).fetchone()
+            if row:
+                self._conn.execute(
+                    "UPDATE app_session SET updated_time = ? WHERE session_id = ? AND state_key = ?",
+                    (now, session_id, OWNER_KEY)
+                )
+        return deserialize(row[0]) if row else None
+
+    def get(self, session_id, key, default=None):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state_value FROM app_session WHERE session_id = ? AND state_key = ?", (session_id, key)
+            ).fetchone()
+        return deserialize(row[0]) if row else default
+
+    def set(self, session_id, key, value):
+        with self._lock, self._conn:
+            now = time.time()
+            self._conn.execute(
+                "INSERT INTO app_session (session_id, state_key, state_value, created_time, updated_time) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (session_id, state_key) DO UPDATE SET "
+                "state_value = excluded.state_value, updated_time = excluded.updated_time",
+                (session_id, key, serialize(value), now, now)
+            )
+        return True
+
+    def rename(self, session_id, new_session_id):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE app_session SET session_id = ?, created_time = ?, updated_time = ? WHERE session_id = ?",
+                (new_session_id, now, now, session_id)
+            )
+
+    def delete(self, session_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM app_session WHERE session_id = ?", (session_id,))
+
+    def purge_expired(self):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM app_session WHERE session_id IN ("
+                "SELECT session_id FROM app_session GROUP BY session_id "
+                "HAVING MAX(updated_time) <= ? OR MIN(created_time) <= ?)",
+                (now - self.idle_timeout_s, now - self.max_age_s)
+            )
+
+@st.cache_resource
+def init_session_store():
+    """
+    Pick the backend from the `[session_store]` secrets section: backend = "postgres" or "local" (default).
+    Expiry is set with idle_timeout_hours (default 12) and max_age_hours (default 168).
+    """
+    config = st.secrets.get("session_store", {})
+    idle_timeout_s = float(config.get("idle_timeout_hours", IDLE_TIMEOUT_S / 3600)) * 3600
+    max_age_s = float(config.get("max_age_hours", MAX_AGE_S / 3600)) * 3600
+    if config.get("backend", "local") == "postgres":
+        return PostgresSessionStore(PostgresOperator(init_connection()), idle_timeout_s, max_age_s)
+    return LocalSessionStore(config.get("path", "sessions.db"), idle_timeout_s, max_age_s)
+
+def get_session_id():
+    return st.query_params.get(SESSION_ID_PARAM)
+
+def check_session():
+    """
+    Run at the start of every rerun: refresh the idle timer of the session in the URL, or drop the session id
+    when the session has expired, has no owner or belongs to another user. An expired session also logs out.
+    """
+    session_id = get_session_id()
+    if not session_id:
+        return None
+    store = init_session_store()
+    try:
+        owner = store.touch(session_id)
+    except Exception as e:
+        st.error(f"Failed to check the session: {e}")
+        return None
+    logged_in = st.session_state.get("logged_in")
+    if owner is not None and (not logged_in or owner == st.session_state.get("user_id")):
+        return session_id
+    if owner is None:
+        store.delete(session_id)
+        if logged_in:
+            for key, default in (("logged_in", False), ("username", ""), ("user_id", None)):
+                st.session_state[key] = default
+    del st.query_params[SESSION_ID_PARAM]
+    return None
+
+def start_session(user_id):
+    """
+    Issue a new session id for `user_id` at login and expose it in the URL. The session in the URL keeps its
+    state under the new id when it is still active and owned by the same user, and is deleted when it has expired.
+    Expired sessions of all users are purged.
+    """
+    store = init_session_store()
+    session_id = secrets.token_urlsafe(32)
+    previous_id = get_session_id()
+    if previous_id:
+        owner = store.touch(previous_id)
+        if owner == user_id:
+            store.rename(previous_id, session_id)
+        elif owner is None:
+            store.delete(previous_id)
+    store.purge_expired()
+    store.set(session_id, OWNER_KEY, user_id)
+    st.query_params[SESSION_ID_PARAM] = session_id
+    return session_id
+
+def end_session():
+    session_id = get_session_id()
+    if session_id:
+        init_session_store().delete(session_id)
+        del st.query_params[SESSION_ID_PARAM]
+
+def _owned_session_id():
+    """The session id in the URL once a user has logged in to this Streamlit session (see check_session)."""
+    return get_session_id() if st.session_state.get("logged_in") else None
+
+def restore_state(key, default=None):
+    """Lazily load `key` from the session store into st.session_state on first use in this process."""
+    if key in st.session_state:
+        return
+    session_id = _owned_session_id()
+    value = init_session_store().get(session_id, key, _MISSING) if session_id else _MISSING
+    st.session_state[key] = default if value is _MISSING else value
+
+def persist_state(*keys):
+    """Write the current values of `keys` to the session store. Login status is never written."""
+    session_id = _owned_session_id()
+    if not session_id:
+        return
+    store = init_session_store()
+    for key in keys:
+        if key not in AUTH_KEYS:
+            store.set(session_id, key, st.session_state.get(key))
@@ -0,0 +1,227 @@
+import argparse
+import calendar
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from utils import init_connection
+from postgres_operator import PostgresOperator
+
+# Incremental spending anomaly and overspend detection over all users' expenses.
+# Each run only reads the expenses queued by a trigger since the last run and folds them into small aggregates
+# (monthly spend and running amount sums per category), so it never rescans the transaction history.
+
+KEYS = ["user_id", "category_id"]
+
+def _records(df, columns):
+    """DataFrame rows as lists of plain Python values (psycopg2 cannot adapt NumPy scalars)."""
+    subset = df[columns].astype(object)
+    return subset.where(pd.notna(subset), None).values.tolist()
+
+def _month_start(dates):
+    return pd.to_datetime(dates).dt.to_period("M").dt.to_timestamp().dt.date
+
+def _add_months(month, months):
+    total = month.year * 12 + month.month - 1 + months
+    return date(total // 12, total % 12 + 1, 1)
+
+def transaction_anomalies(new_df, stats_df, z_threshold=3.0, min_count=5):
+    """
+    Score new transactions against their category's amount distribution before this batch.
+    Returns the flagged transactions with their z-score.
+    """
+    merged = new_df.merge(stats_df, on=KEYS, how="left")
+    count = merged["transaction_count"].fillna(0).astype(float)
+    mean = merged["amount_sum"].fillna(0).astype(float) / count.replace(0, np.nan)
+    variance = merged["amount_sumsq"].fillna(0).astype(float) / count.replace(0, np.nan) - mean ** 2
+    std = np.sqrt(variance.clip(lower=0))
+    merged["z_score"] = ((merged["amount"] - mean) / std.replace(0, np.nan)).where(count >= min_count)
+    merged["baseline_mean"] = mean
+    return merged[merged["z_score"] > z_threshold]
+
+def batch_amount_stats(new_df):
+    """Per-category count, sum and sum of squares of the new amounts, to add to the running stats."""
+    return (
+        new_df.assign(amount_sq=new_df["amount"] ** 2)
+        .groupby(KEYS, as_index=False)
+        .agg(transaction_count=("amount", "size"), amount_sum=("amount", "sum"), amount_sumsq=("amount_sq", "sum"))
+    )
+
+def batch_month_spend(new_df):
+    return (
+        new_df.groupby(KEYS + ["spend_month"], as_index=False)
+        .agg(spend=("amount", "sum"), transaction_count=("amount", "size"))
+    )
+
+def month_anomalies(history_df, affected_df, baseline_months=6, z_threshold=3.0, min_months=3):
+    """
+    Compare each affected month's spend with the rolling baseline of the category's previous months.
+    Returns the affected months with baseline mean/std and z-score (all affected rows, not only flagged).
+    """
+    history_df = history_df.sort_values(KEYS + ["spend_month"]).reset_index(drop=True)
+    history_df["previous_spend"] = history_df.groupby(KEYS)["spend"].shift(1)
+    rolling = history_df.groupby(KEYS)["previous_spend"].rolling(baseline_months, min_periods=min_months)
+    history_df["baseline_mean"] = rolling.mean().reset_index(level=KEYS, drop=True)
+    history_df["baseline_std"] = rolling.std().reset_index(level=KEYS, drop=True)
+    history_df["z_score"] = (
+        (history_df["spend"] - history_df["baseline_mean"]) / history_df["baseline_std"].replace(0, np.nan)
+    )
+    scored = affected_df[KEYS + ["spend_month"]].merge(history_df, on=KEYS + ["spend_month"], how="inner")
+    scored["is_anomaly"] = scored["z_score"] > z_threshold
+    return scored
+
+def burn_rate(scored_df, allocations_df, as_of):
+    """
+    Project month-end spend from the month-to-date burn rate and compare it with the allocation.
+    Past months compare actual spend; the current month extrapolates by days elapsed.
+    """
+    df = scored_df.merge(allocations_df, on=KEYS + ["spend_month"], how="left")
+    df["allocation"] = df["allocation"].fillna(0).astype(float)
+    days_in_month = df["spend_month"].map(lambda m: calendar.monthrange(m.year, m.month)[1])
+    current_month = as_of.replace(day=1)
+    days_elapsed = np.where(df["spend_month"] == current_month, as_of.day, days_in_month)
+    df["projected_spend"] = df["spend"] / days_elapsed * days_in_month
+    df["is_current_month"] = df["spend_month"] == current_month
+    df["is_overspent"] = (df["allocation"] > 0) & (df["spend"] > df["allocation"])
+    df["is_projected_overspend"] = (
+        df["is_current_month"] & (df["allocation"] > 0) & ~df["is_overspent"] & (df["projected_spend"] > df["allocation"])
+    )
+    return df
+
+def build_alerts(txn_flags, scored_df):
+    """Alert rows: (user_id, category_id, alert_month, alert_type, transaction_id, metric, message)."""
+    alerts = []
+    for row in txn_flags.itertuples(index=False):
+        alerts.append((row.user_id, row.category_id, row.spend_month, "unusual_transaction", row.transaction_id,
+                       round(float(row.z_score), 2),
+                       f"Expense of {row.amount:,.0f} is {row.z_score:.1f} std above the usual {row.baseline_mean:,.0f}."))
+    for row in scored_df[scored_df["is_anomaly"]].itertuples(index=False):
+        alerts.append((row.user_id, row.category_id, row.spend_month, "unusual_month", None,
+                       round(float(row.z_score), 2),
+                       f"Spending of {row.spend:,.0f} this month is {row.z_score:.1f} std above the usual {row.baseline_mean:,.0f}."))
+    for row in scored_df[scored_df["is_overspent"]].itertuples(index=False):
+        alerts.append((row.user_id, row.category_id, row.spend_month, "overspent", None,
+                       round(float(row.spend / row.allocation * 100), 2),
+                       f"Spent {row.spend:,.0f} of a {row.allocation:,.0f} budget."))
+    for row in scored_df[scored_df["is_projected_overspend"]].itertuples(index=False):
+        alerts.append((row.user_id, row.category_id, row.spend_month, "projected_overspend", None,
+                       round(float(row.projected_spend / row.allocation * 100), 2),
+                       f"On track to spend {row.projected_spend:,.0f} of a {row.allocation:,.0f} budget."))
+    return [
+        (int(user_id), int(category_id), month, alert_type, None if txn_id is None else int(txn_id), metric, message)
+        for user_id, category_id, month, alert_type, txn_id, metric, message in alerts
+    ]
+
+def rescored_months(scored_df):
+    """(user_id, category_id, month) of every rescored month, whose month-level alerts are replaced."""
+    return [
+        (int(user_id), int(category_id), month)
+        for user_id, category_id, month in scored_df[KEYS + ["spend_month"]].drop_duplicates().itertuples(index=False)
+    ]
+
+def process_batch(db_operator, batch_size=50000, as_of=None, baseline_months=6, z_threshold=3.0):
+    """
+    Process the next batch of queued expenses in one transaction.
+    Returns (processed transactions, alerts), or None when another run holds the lock.
+    """
+    as_of = as_of or date.today()
+    with db_operator.transaction(workload="batch") as tx:
+        if not tx.select('queries/select_try_lock_spending_analytics.sql')[0]["locked"]:
+            return None
+
+        # Claimed queue rows are deleted in this transaction, so a failed run leaves them queued
+        new_rows = tx.select('queries/delete_queued_expense_transactions.sql', {"limit": batch_size})
+        if not new_rows:
+            return 0, 0
+
+        new_df = pd.DataFrame(new_rows)
+        new_df["amount"] = new_df["amount"].astype(float)
+        new_df["spend_month"] = _month_start(new_df["transaction_date"])
+        keys_df = new_df[KEYS].drop_duplicates()
+        key_params = {"user_ids": keys_df["user_id"].tolist(), "category_ids": keys_df["category_id"].tolist()}
+
+        # Transaction-level z-scores against the running stats, then fold the batch into them
+        stats_df = pd.DataFrame(
+            tx.select('queries/select_amount_stats_for_categories.sql', key_params),
+            columns=KEYS + ["transaction_count", "amount_sum", "amount_sumsq"]
+        )
+        txn_flags = transaction_anomalies(new_df, stats_df, z_threshold=z_threshold)
+        stats_batch = batch_amount_stats(new_df)
+        tx.execute_many(
+            'queries/upsert_amount_stats.sql',
+            _records(stats_batch, KEYS + ["transaction_count", "amount_sum", "amount_sumsq"]),
+            template="(%s, %s, %s, %s, %s, NOW())"
+        )
+
+        # Monthly spend, then rolling baselines and burn rate for the months this batch touched
+        month_batch = batch_month_spend(new_df)
+        tx.execute_many(
+            'queries/upsert_month_spend.sql',
+            _records(month_batch, KEYS + ["spend_month", "spend", "transaction_count"]),
+            template="(%s, %s, %s, %s, %s, NOW())"
+        )
+        since_month = _add_months(min(month_batch["spend_month"]), -baseline_months)
+        history_df = pd.DataFrame(
+            tx.select('queries/select_month_spend_history.sql', {**key_params, "since_month": since_month}),
+            columns=KEYS + ["spend_month", "spend"]
+        )
+        history_df["spend"] = history_df["spend"].astype(float)
+        scored_df = month_anomalies(history_df, month_batch, baseline_months=baseline_months, z_threshold=z_threshold)
+
+        allocations_df = pd.DataFrame(
+            tx.select('queries/select_allocations_for_months.sql', {
+                "user_ids": month_batch["user_id"].tolist(),
+                "category_ids": month_batch["category_id"].tolist(),
+                "months": month_batch["spend_month"].tolist(),
+            }),
+            columns=KEYS + ["spend_month", "allocation"]
+        )
+        scored_df = burn_rate(scored_df, allocations_df, as_of)
+
+        # Month-level alerts that no longer hold (e.g. a z-score diluted by later spend) are cleared, not kept
+        alerts = build_alerts(txn_flags, scored_df)
+        tx.execute_many('queries/delete_month_spending_alerts.sql', rescored_months(scored_df), template="(%s, %s, %s)")
+        tx.execute_many('queries/upsert_spending_alerts.sql', alerts, template="(%s, %s, %s, %s, %s, %s, %s, NOW())")
+        return len(new_df), len(alerts)
+
+def run_incremental(db_operator, batch_size=50000, as_of=None, baseline_months=6, z_threshold=3.0):
+    """Process all expenses recorded since the last run. Cheap enough to call after every write."""
+    processed, alerts = 0, 0
+    while True:
+        result = process_batch(db_operator, batch_size, as_of, baseline_months, z_threshold)
+        if result is None:
+            return None
+        batch_processed, batch_alerts = result
+        processed += batch_processed
+        alerts += batch_alerts
+        if batch_processed < batch_size:
+            return processed, alerts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental spending anomaly and overspend detection.")
+    parser.add_argument("--install", action="store_true", help="Create the analytics tables first.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Drop all aggregates and alerts and reprocess from scratch (after expenses are edited or deleted).")
+    parser.add_argument("--batch-size", type=int, default=50000)
+    parser.add_argument("--baseline-months", type=int, default=6)
+    parser.add_argument("--z-threshold", type=float, default=3.0)
+    args = parser.parse_args()
+
+    db_pool = init_connection()
+    db_operator = PostgresOperator(db_pool)
+
+    if args.install:
+        _, error = db_operator.execute_insert('queries/create_spending_analytics.sql')
+        if error:
+            raise SystemExit(f"Failed to install spending analytics: {error}")
+    if args.rebuild:
+        _, error = db_operator.execute_insert('queries/rebuild_spending_analytics.sql')
+        if error:
+            raise SystemExit(f"Failed to reset spending analytics: {error}")
+
+    result = run_incremental(db_operator, args.batch_size, None, args.baseline_months, args.z_threshold)
+    if result is None:
+        print("Another run is in progress; skipped.")
+    else:
+        print(f"Processed {result[0]} new transaction(s), raised or refreshed {result[1]} alert(s).")
@@ -0,0 +1,72 @@
+import re
+import threading
+from collections import Counter
+
+def tokenize(text):
+    return re.findall(r"\w+", (text or "").lower())
+
+class _TrieNode:
+    __slots__ = ("children", "counts")
+
+    def __init__(self):
+        self.children = {}
+        self.counts = Counter()
+
+class SuggestionIndex:
+    """
+    In-memory token prefix trie of one user's transaction descriptions.
+    Every node counts the outcomes (bucket, category, location) seen with words starting with its prefix,
+    so suggestions for a partially typed description are a few dictionary lookups.
+    """
+    def __init__(self):
+        self._root = _TrieNode()
+        self._lock = threading.Lock()
+
+    def add(self, description, outcome, count=1):
+        """Record `count` transactions with this description and (bucket, category, location) outcome."""
+        with self._lock:
+            for token in set(tokenize(description)):
+                node = self._root
+                for char in token:
+                    node = node.children.setdefault(char, _TrieNode())
+                    node.counts[outcome] += count
+
+    def _find(self, prefix):
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def suggest(self, text, limit=5):
+        """
+        Return up to `limit` (outcome, frequency) pairs for a partially typed description.
+        Outcomes matching more of the typed words rank first, then by frequency.
+        """
+        tokens = tokenize(text)
+        if not tokens:
+            return []
+
+        matched_tokens = Counter()
+        frequency = Counter()
+        with self._lock:
+            for token in set(tokens):
+                node = self._find(token)
+                if node is None:
+                    continue
+                for outcome, count in node.counts.items():
+                    matched_tokens[outcome] += 1
+                    # The same transactions match every typed word, so their count is taken once, not summed
+                    frequency[outcome] = max(frequency[outcome], count)
+
+        ranked = sorted(frequency, key=lambda outcome: (matched_tokens[outcome], frequency[outcome]), reverse=True)
+        return [(outcome, frequency[outcome]) for outcome in ranked[:limit]]
+
+def build_index(rows):
+    """Build an index from rows with description, bucket_name, category_name, location_name and frequency."""
+    index = SuggestionIndex()
+    for row in rows:
+        outcome = (row["bucket_name"], row["category_name"], row["location_name"])
+        index.add(row["description"], outcome, count=int(row["frequency"]))
+    return index
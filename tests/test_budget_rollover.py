@@ -0,0 +1,84 @@
+import os
+from datetime import date
+
+import pytest
+from dotenv import load_dotenv
+
+from postgres_operator import _read_query
+
+# Runs the rollover queries against the database in DB_NAME (see utils.connection_params) and rolls back
+load_dotenv()
+pytestmark = pytest.mark.skipif(not os.environ.get("DB_NAME"), reason="needs a PostgreSQL database (DB_NAME)")
+
+SOURCE_MONTH = date(2026, 9, 1)
+TARGET_MONTH = date(2026, 10, 1)
+
+@pytest.fixture
+def cursor():
+    from utils import connect
+    conn = connect()
+    try:
+        with conn.cursor() as cursor:
+            yield cursor
+    finally:
+        conn.rollback()
+        conn.close()
+
+def add_allocation(cursor, month, amount, category_id, user_id):
+    cursor.execute(
+        "INSERT INTO fact_transaction (updated_time, transaction_date, description, amount, category_id, action_id, user_id) "
+        "VALUES (NOW(), %s, 'rollover test', %s, %s, 3, %s)",
+        (month, amount, category_id, user_id)
+    )
+
+def rollover(cursor, user_id, overwrite):
+    params = {"source_month": SOURCE_MONTH, "target_month": TARGET_MONTH, "scale": 1.0,
+              "overwrite": overwrite, "user_id": user_id, "description": "rollover test"}
+    cursor.execute(_read_query("queries/select_lock_budget_rollover.sql"), params)
+    cursor.execute(_read_query("queries/select_budget_rollover_preview.sql"), params)
+    preview = cursor.fetchall()
+    cursor.execute(_read_query("queries/insert_budget_rollover.sql"), params)
+    return preview, cursor.fetchone()
+
+def target_allocations(cursor, user_id):
+    cursor.execute(
+        "SELECT COUNT(*), SUM(amount) FROM fact_transaction "
+        "WHERE action_id = 3 AND user_id = %s AND transaction_date = %s",
+        (user_id, TARGET_MONTH)
+    )
+    return cursor.fetchone()
+
+@pytest.fixture
+def user_and_category(cursor):
+    cursor.execute("INSERT INTO dim_user (username, password) VALUES ('rollover_test_user', 'test') RETURNING id")
+    user_id = cursor.fetchone()[0]
+    cursor.execute(
+        "INSERT INTO dim_category (updated_time, category_name, bucket_id, user_id) "
+        "SELECT NOW(), 'Rollover test', MIN(id), %s FROM dim_bucket RETURNING id",
+        (user_id,)
+    )
+    return user_id, cursor.fetchone()[0]
+
+def test_overwrite_with_duplicate_targets_matches_preview(cursor, user_and_category):
+    user_id, category_id = user_and_category
+    add_allocation(cursor, SOURCE_MONTH, 1_000_000, category_id, user_id)
+    add_allocation(cursor, TARGET_MONTH, 400_000, category_id, user_id)
+    add_allocation(cursor, TARGET_MONTH, 600_000, category_id, user_id)
+
+    preview, (inserted, updated, deleted) = rollover(cursor, user_id, overwrite=True)
+
+    new_amount = preview[0][3]
+    assert (inserted, updated, deleted) == (0, 1, 1)
+    assert target_allocations(cursor, user_id) == (1, new_amount)
+    assert new_amount == 1_000_000
+
+def test_without_overwrite_keeps_existing_targets(cursor, user_and_category):
+    user_id, category_id = user_and_category
+    add_allocation(cursor, SOURCE_MONTH, 1_000_000, category_id, user_id)
+    add_allocation(cursor, TARGET_MONTH, 400_000, category_id, user_id)
+    add_allocation(cursor, TARGET_MONTH, 600_000, category_id, user_id)
+
+    _, (inserted, updated, deleted) = rollover(cursor, user_id, overwrite=False)
+
+    assert (inserted, updated, deleted) == (0, 0, 0)
+    assert target_allocations(cursor, user_id) == (2, 1_000_000)
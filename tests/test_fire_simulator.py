@@ -0,0 +1,36 @@
+import numpy as np
+
+from fire_simulator import derive_profile, simulate_time_to_fi
+
+def test_derive_profile_without_history():
+    assert derive_profile([]) is None
+
+def test_derive_profile_savings_rate():
+    rows = [
+        {"month": 1, "net_income": 10_000_000, "spending": 6_000_000},
+        {"month": 2, "net_income": 10_000_000, "spending": 8_000_000},
+    ]
+    profile = derive_profile(rows)
+    assert profile["months"] == 2
+    assert profile["annual_income"] == 120_000_000
+    assert profile["annual_spending_mean"] == 84_000_000
+    assert np.isclose(profile["savings_rate"], 0.3)
+
+def test_derive_profile_negative_savings_rate():
+    rows = [{"month": 1, "net_income": 5_000_000, "spending": 10_000_000}]
+    assert np.isclose(derive_profile(rows)["savings_rate"], -1.0)
+
+def test_derive_profile_without_income_has_no_savings_rate():
+    rows = [{"month": 1, "net_income": None, "spending": 3_000_000}]
+    assert derive_profile(rows)["savings_rate"] is None
+
+def test_simulation_is_reproducible_and_monotonic():
+    kwargs = dict(
+        current_portfolio=0, annual_income=200_000_000, annual_spending_mean=80_000_000,
+        annual_spending_std=5_000_000, max_years=40, n_paths=2_000, seed=1,
+    )
+    first = simulate_time_to_fi(**kwargs)
+    second = simulate_time_to_fi(**kwargs)
+    np.testing.assert_array_equal(first["years_to_fi"], second["years_to_fi"])
+    assert np.all(np.diff(first["success_by_year"]) >= 0)
+    assert 0 < first["success_probability"] <= 1
@@ -0,0 +1,15 @@
+from postgres_operator import _memo_key
+
+def test_memo_key_is_independent_of_dict_order():
+    assert _memo_key("q.sql", {"a": 1, "b": 2}) == _memo_key("q.sql", {"b": 2, "a": 1})
+
+def test_memo_key_normalizes_lists():
+    assert _memo_key("q.sql", [1, 2]) == _memo_key("q.sql", (1, 2))
+
+def test_memo_key_separates_queries_and_params():
+    assert _memo_key("a.sql", (1,)) != _memo_key("b.sql", (1,))
+    assert _memo_key("a.sql", (1,)) != _memo_key("a.sql", (2,))
+    assert _memo_key("a.sql", None) == ("a.sql", None)
+
+def test_memo_key_unhashable_params():
+    assert _memo_key("q.sql", {"ids": [1, 2]}) is None
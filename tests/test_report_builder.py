@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from report_builder import format_report_rows, numeric_report_rows, split_report_rows, summarize_report
+
+def report_row(row_level, bucket_name, category_name, budget, expenses):
+    budget, expenses = Decimal(budget), Decimal(expenses)
+    return {
+        "row_level": row_level,
+        "bucket_name": bucket_name,
+        "category_name": category_name,
+        "budget": budget,
+        "expenses": expenses,
+        "remaining": budget + expenses,
+        "percentage_spent": abs(expenses) / budget * 100 if budget > 0 else Decimal(0),
+    }
+
+RESULTS = [
+    report_row("category", "Needs", "Food", "4000000", "-3000000"),
+    report_row("category", "Needs", "Rent", "6000000", "-6000000"),
+    report_row("bucket", "Needs", None, "10000000", "-9000000"),
+    report_row("total", None, None, "10000000", "-9000000"),
+]
+
+def test_split_report_rows():
+    table_rows, total_row = split_report_rows(RESULTS)
+    assert [row["row_level"] for row in table_rows] == ["category", "category", "bucket"]
+    assert total_row["row_level"] == "total"
+
+def test_split_report_rows_without_data():
+    assert split_report_rows([]) == ([], None)
+
+def test_summarize_report():
+    summary = summarize_report(RESULTS[-1])
+    assert summary == {
+        "total_budget": 10_000_000.0,
+        "total_expenses": -9_000_000.0,
+        "total_remaining": 1_000_000.0,
+        "percentage_spent": 90.0,
+    }
+    assert summarize_report(None)["total_budget"] == 0.0
+
+def test_numeric_report_rows_label_subtotals():
+    rows = numeric_report_rows(split_report_rows(RESULTS)[0])
+    assert [row["Category"] for row in rows] == ["Food", "Rent", "Subtotal"]
+    assert rows[0]["Remaining"] == 1_000_000.0
+    assert isinstance(rows[0]["Budget"], float)
+
+def test_format_report_rows():
+    row = format_report_rows(RESULTS[:1])[0]
+    assert row["Budget"] == "4,000,000"
+    assert row["Expenses"] == "-3,000,000"
+    assert row["Percentage Spent"] == "75.00%"
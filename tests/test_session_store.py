@@ -0,0 +1,70 @@
+import time
+from datetime import date, datetime
+from decimal import Decimal
+
+from session_store import OWNER_KEY, LocalSessionStore, deserialize, serialize
+
+def test_serialize_round_trip():
+    value = {
+        "income_records": [{"date": date(2026, 10, 1), "amount": Decimal("12500000.50"), "note": "salary"}],
+        "income_date": datetime(2026, 10, 19, 8, 30),
+        "cursor": (date(2026, 10, 1), 42),
+        "total_debt": 0.0,
+        "empty": None,
+    }
+    assert deserialize(serialize(value)) == value
+
+def test_serialize_compresses():
+    value = ["same description"] * 200
+    assert len(serialize(value)) < len(str(value)) / 10
+
+def make_store(tmp_path, **limits):
+    return LocalSessionStore(str(tmp_path / "sessions.db"), **limits)
+
+def test_touch_returns_owner(tmp_path):
+    store = make_store(tmp_path)
+    store.set("sid", OWNER_KEY, 7)
+    store.set("sid", "current_page", "budget")
+    assert store.touch("sid") == 7
+    assert store.get("sid", "current_page") == "budget"
+    assert store.touch("unknown") is None
+
+def test_session_without_owner_is_inactive(tmp_path):
+    store = make_store(tmp_path)
+    store.set("sid", "current_page", "budget")
+    assert store.touch("sid") is None
+
+def test_idle_session_expires(tmp_path):
+    store = make_store(tmp_path, idle_timeout_s=0.05)
+    store.set("sid", OWNER_KEY, 7)
+    time.sleep(0.03)
+    # Reads refresh the idle timer
+    assert store.touch("sid") == 7
+    time.sleep(0.03)
+    assert store.touch("sid") == 7
+    time.sleep(0.1)
+    assert store.touch("sid") is None
+
+def test_max_age_expires_despite_activity(tmp_path):
+    store = make_store(tmp_path, max_age_s=0.05)
+    store.set("sid", OWNER_KEY, 7)
+    time.sleep(0.1)
+    assert store.touch("sid") is None
+
+def test_rename_keeps_state(tmp_path):
+    store = make_store(tmp_path)
+    store.set("old", OWNER_KEY, 7)
+    store.set("old", "data", [1, 2])
+    store.rename("old", "new")
+    assert store.touch("old") is None
+    assert store.touch("new") == 7
+    assert store.get("new", "data") == [1, 2]
+
+def test_purge_expired(tmp_path):
+    store = make_store(tmp_path, idle_timeout_s=0.05)
+    store.set("stale", OWNER_KEY, 7)
+    time.sleep(0.1)
+    store.set("fresh", OWNER_KEY, 8)
+    store.purge_expired()
+    assert store.get("stale", OWNER_KEY) is None
+    assert store.get("fresh", OWNER_KEY) == 8
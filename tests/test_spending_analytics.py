@@ -0,0 +1,112 @@
+from contextlib import contextmanager
+from datetime import date
+
+import pandas as pd
+
+from spending_analytics import (
+    KEYS, build_alerts, burn_rate, month_anomalies, process_batch, rescored_months, transaction_anomalies,
+)
+
+def month_history(spends, user_id=1, category_id=10, start=date(2026, 1, 1)):
+    months = [start.replace(month=start.month + i) for i in range(len(spends))]
+    return pd.DataFrame({"user_id": user_id, "category_id": category_id, "spend_month": months, "spend": spends})
+
+def test_transaction_anomalies():
+    stats_df = pd.DataFrame({
+        "user_id": [1], "category_id": [10],
+        # 10 amounts of 100,000 and 10 of 120,000: mean 110,000, std 10,000
+        "transaction_count": [20], "amount_sum": [2_200_000.0], "amount_sumsq": [244_000_000_000.0],
+    })
+    new_df = pd.DataFrame({
+        "transaction_id": [1, 2], "user_id": [1, 1], "category_id": [10, 10], "amount": [115_000.0, 200_000.0],
+    })
+    flagged = transaction_anomalies(new_df, stats_df, z_threshold=3.0)
+    assert flagged["transaction_id"].tolist() == [2]
+    assert round(flagged["z_score"].iloc[0], 2) == 9.0
+    assert flagged["baseline_mean"].iloc[0] == 110_000.0
+
+def test_transaction_anomalies_need_enough_history():
+    stats_df = pd.DataFrame({
+        "user_id": [1], "category_id": [10], "transaction_count": [2], "amount_sum": [200.0], "amount_sumsq": [20_000.0],
+    })
+    new_df = pd.DataFrame({"transaction_id": [1], "user_id": [1], "category_id": [10], "amount": [1_000_000.0]})
+    assert transaction_anomalies(new_df, stats_df).empty
+
+def test_month_anomalies_score_against_previous_months():
+    history_df = month_history([100.0, 110.0, 90.0, 100.0, 400.0])
+    scored = month_anomalies(history_df, history_df.tail(1), baseline_months=6, z_threshold=3.0)
+    row = scored.iloc[0]
+    assert row["baseline_mean"] == 100.0
+    assert round(row["z_score"], 1) == round(300 / history_df["spend"].head(4).std(), 1)
+    assert bool(row["is_anomaly"])
+
+def test_burn_rate_projects_current_month():
+    scored_df = month_history([100.0, 40.0], start=date(2026, 9, 1))
+    allocations_df = pd.DataFrame({
+        "user_id": [1, 1], "category_id": [10, 10],
+        "spend_month": [date(2026, 9, 1), date(2026, 10, 1)], "allocation": [80.0, 60.0],
+    })
+    df = burn_rate(scored_df, allocations_df, as_of=date(2026, 10, 10))
+    september, october = df.iloc[0], df.iloc[1]
+    assert bool(september["is_overspent"]) and not bool(september["is_projected_overspend"])
+    assert october["projected_spend"] == 40.0 / 10 * 31
+    assert not bool(october["is_overspent"]) and bool(october["is_projected_overspend"])
+
+def test_unusual_month_message_uses_the_mean():
+    history_df = month_history([100.0, 110.0, 90.0, 100.0, 400.0])
+    scored = month_anomalies(history_df, history_df.tail(1))
+    scored = scored.assign(is_overspent=False, is_projected_overspend=False)
+    alerts = build_alerts(pd.DataFrame(columns=KEYS), scored)
+    assert [alert[3] for alert in alerts] == ["unusual_month"]
+    assert "above the usual 100." in alerts[0][6]
+
+def test_rescored_months():
+    scored_df = pd.concat([month_history([1.0, 2.0]), month_history([3.0], category_id=11)])
+    assert rescored_months(scored_df) == [
+        (1, 10, date(2026, 1, 1)), (1, 10, date(2026, 2, 1)), (1, 11, date(2026, 1, 1)),
+    ]
+
+class RecordingTransaction:
+    """Answers process_batch's reads from canned rows and records its writes."""
+    def __init__(self, rows):
+        self.rows = rows
+        self.writes = []
+
+    def select(self, query_path, params=None):
+        name = query_path.rsplit("/", 1)[-1]
+        if name == "select_month_spend_history.sql":
+            # Only the month spend just upserted by the batch
+            return [row[:4] for row in self.writes_of("upsert_month_spend.sql")]
+        return self.rows.get(name, [])
+
+    def execute_many(self, query_path, rows, template=None):
+        self.writes.append((query_path.rsplit("/", 1)[-1], rows))
+        return len(rows)
+
+    def writes_of(self, name):
+        return [row for query, rows in self.writes if query == name for row in rows]
+
+class RecordingOperator:
+    def __init__(self, tx):
+        self.tx = tx
+
+    @contextmanager
+    def transaction(self, workload="interactive"):
+        yield self.tx
+
+def test_process_batch_clears_month_alerts_that_no_longer_hold():
+    # An ordinary expense in a month that was overspent before its budget was raised
+    tx = RecordingTransaction({
+        "select_try_lock_spending_analytics.sql": [{"locked": True}],
+        "delete_queued_expense_transactions.sql": [
+            {"transaction_id": 7, "user_id": 1, "category_id": 10, "transaction_date": date(2026, 9, 5), "amount": 50.0},
+        ],
+        "select_allocations_for_months.sql": [(1, 10, date(2026, 9, 1), 1_000.0)],
+    })
+
+    assert process_batch(RecordingOperator(tx), as_of=date(2026, 10, 19)) == (1, 0)
+
+    written = [query for query, _ in tx.writes]
+    assert written.index("delete_month_spending_alerts.sql") < written.index("upsert_spending_alerts.sql")
+    assert tx.writes_of("delete_month_spending_alerts.sql") == [(1, 10, date(2026, 9, 1))]
+    assert tx.writes_of("upsert_spending_alerts.sql") == []
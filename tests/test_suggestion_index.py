@@ -0,0 +1,36 @@
+from suggestion_index import build_index, tokenize
+
+GRAB = ("Needs", "Transport", "Grab")
+HIGHLANDS = ("Wants", "Coffee", "Highlands")
+
+def make_index():
+    return build_index([
+        {"description": "Grab work", "bucket_name": "Needs", "category_name": "Transport",
+         "location_name": "Grab", "frequency": 3},
+        {"description": "Highlands with team", "bucket_name": "Wants", "category_name": "Coffee",
+         "location_name": "Highlands", "frequency": 2},
+    ])
+
+def test_tokenize():
+    assert tokenize("Grab, to WORK!") == ["grab", "to", "work"]
+    assert tokenize(None) == []
+
+def test_suggest_prefix():
+    assert make_index().suggest("gr") == [(GRAB, 3)]
+
+def test_suggest_counts_frequency_once_across_tokens():
+    # "grab" and "w" both match the same 3 transactions
+    assert make_index().suggest("grab w")[0] == (GRAB, 3)
+
+def test_suggest_ranks_more_matched_tokens_first():
+    suggestions = make_index().suggest("grab w")
+    assert [outcome for outcome, _ in suggestions] == [GRAB, HIGHLANDS]
+    assert suggestions[1] == (HIGHLANDS, 2)
+
+def test_suggest_without_match():
+    index = make_index()
+    assert index.suggest("xyz") == []
+    assert index.suggest("") == []
+
+def test_suggest_limit():
+    assert len(make_index().suggest("grab w", limit=1)) == 1
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+import pytest
+import streamlit
+from streamlit.runtime.scriptrunner.script_requests import RerunData, ScriptRequests
+
+import workload
+from workload import BATCH, INTERACTIVE, REPORTING, WorkloadClass, workload_for
+
+def test_workload_for():
+    assert workload_for("queries/select_expense_report_by_period.sql") is REPORTING
+    assert workload_for("queries/select_users.sql") is BATCH
+    assert workload_for("queries/create_spending_analytics.sql") is BATCH
+    assert workload_for("queries/rebuild_spending_analytics.sql") is BATCH
+    assert workload_for("queries/insert_expenses.sql") is INTERACTIVE
+
+def test_timed_sets_statement_timeout_in_the_same_round_trip():
+    assert INTERACTIVE.timed("SELECT 1") == "SET LOCAL statement_timeout = 5000; SELECT 1"
+
+def test_acquire_rejects_when_class_is_full():
+    limited = WorkloadClass("test", statement_timeout_ms=1000, max_concurrency=1, queue_timeout_s=0.01)
+    waits = []
+    limited.wait_observer = waits.append
+    assert limited.acquire()
+    assert not limited.acquire()
+    assert (limited.in_flight, limited.rejected, len(waits)) == (1, 1, 2)
+    limited.release()
+    assert limited.acquire()
+
+@pytest.fixture
+def script_requests():
+    workload._script_requests_supported.cache_clear()
+    yield ScriptRequests()
+    workload._script_requests_supported.cache_clear()
+
+def make_ctx(script_requests):
+    return SimpleNamespace(script_requests=script_requests, session_id="test-session")
+
+def test_streamlit_version_is_supported(script_requests):
+    # Pins the requirements.txt version: when Streamlit is upgraded, check ScriptRequests._state and extend
+    # workload.SCRIPT_REQUESTS_VERSIONS
+    assert workload._script_requests_supported()
+
+def test_superseded_reads_script_requests(script_requests):
+    ctx = make_ctx(script_requests)
+    assert not workload._superseded(ctx)
+    script_requests.request_rerun(RerunData())
+    assert workload._superseded(ctx)
+
+def test_superseded_on_stop(script_requests):
+    script_requests.request_stop()
+    assert workload._superseded(make_ctx(script_requests))
+
+def test_superseded_ignores_script_requests_on_untested_versions(script_requests, monkeypatch):
+    monkeypatch.setattr(streamlit, "__version__", "9.0.0")
+    script_requests.request_stop()
+    assert not workload._superseded(make_ctx(script_requests))
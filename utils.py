@@ -1,5 +1,9 @@
 # utils.py
+import os
+
+import psycopg2
 import streamlit as st
+from dotenv import load_dotenv
 from psycopg2 import pool
 from psycopg2 import Error
 
@@ -7,7 +11,9 @@ from psycopg2 import Error
 def init_connection():
     secrets = st.secrets["postgres"]
     try:
-        return pool.SimpleConnectionPool(
+        # Thread-safe: every Streamlit session runs its script on its own thread.
+        # workload.py splits maxconn between the interactive, reporting and batch classes.
+        return pool.ThreadedConnectionPool(
             minconn=1,
             maxconn=20,
             dbname=secrets["DB_NAME"],
@@ -20,6 +26,22 @@ def init_connection():
         st.error(f"Error initializing connection pool: {e}")
         return None
 
+def connection_params():
+    """Connection settings of the command-line tools, read from the environment (or a .env file):
+    DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT."""
+    load_dotenv()
+    return {
+        "dbname": os.environ["DB_NAME"],
+        "user": os.environ["DB_USER"],
+        "password": os.environ["DB_PASSWORD"],
+        "host": os.environ["DB_HOST"],
+        "port": os.environ["DB_PORT"],
+    }
+
+def connect():
+    """A single connection for the command-line tools (the app uses init_connection)."""
+    return psycopg2.connect(**connection_params())
+
 def get_db_connection(db_pool):
     if db_pool is None:
         st.error("Connection pool not initialized!")
@@ -34,4 +56,15 @@ def release_connection(db_pool, conn):
 def check_login():
     if "logged_in" not in st.session_state or not st.session_state.logged_in:
         st.error("Please log in to access this page.")
-        st.switch_page("app.py")
\ No newline at end of file
+        st.switch_page("app.py")
+
+def is_admin():
+    """True when the logged-in user is listed in `usernames` of the `[admin]` secrets section."""
+    admins = st.secrets.get("admin", {}).get("usernames", [])
+    return bool(st.session_state.get("logged_in")) and st.session_state.get("username") in admins
+
+def check_admin():
+    check_login()
+    if not is_admin():
+        st.error("This page is only available to administrators.")
+        st.stop()
@@ -0,0 +1,192 @@
+import functools
+import os
+import threading
+import time
+
+# Workload classes for the shared connection pool. Every named query belongs to one class, which sets its
+# statement_timeout and how many pooled connections the class may hold at once. The limits add up to the pool
+# size (utils.init_connection, maxconn=20), so heavy reports can never take the connections of the write path.
+
+class WorkloadBusyError(Exception):
+    """No free slot in the query's workload class within its queue timeout."""
+
+class QueryTimeoutError(Exception):
+    """The query ran past the statement_timeout of its workload class."""
+
+class QueryCancelledError(Exception):
+    """The query was cancelled because the rerun that issued it was superseded."""
+
+class WorkloadClass:
+    def __init__(self, name, statement_timeout_ms, max_concurrency, queue_timeout_s):
+        self.name = name
+        self.statement_timeout_ms = statement_timeout_ms
+        self.max_concurrency = max_concurrency
+        # How long a query waits for a free slot in its class before giving up (None waits indefinitely)
+        self.queue_timeout_s = queue_timeout_s
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        # Optional callback receiving how long each acquire() waited for a slot, in seconds (used by load_test.py)
+        self.wait_observer = None
+
+    def acquire(self):
+        start = time.perf_counter()
+        acquired = self._slots.acquire(timeout=self.queue_timeout_s)
+        if self.wait_observer is not None:
+            self.wait_observer(time.perf_counter() - start)
+        if not acquired:
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.in_flight += 1
+        return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def timed(self, query):
+        """
+        Prefix `query` with the class's statement_timeout. Both statements go in one round trip, and SET LOCAL
+        only lasts until the transaction ends, so the setting never leaks to the next borrower of the connection.
+        """
+        return f"SET LOCAL statement_timeout = {int(self.statement_timeout_ms)}; {query}"
+
+    def count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+INTERACTIVE = WorkloadClass("interactive", statement_timeout_ms=5_000, max_concurrency=12, queue_timeout_s=10)
+REPORTING = WorkloadClass("reporting", statement_timeout_ms=30_000, max_concurrency=5, queue_timeout_s=30)
+BATCH = WorkloadClass("batch", statement_timeout_ms=600_000, max_concurrency=3, queue_timeout_s=None)
+WORKLOAD_CLASSES = {workload.name: workload for workload in (INTERACTIVE, REPORTING, BATCH)}
+
+# Queries not listed here (logins, lookups, expense and budget writes) are interactive
+QUERY_WORKLOADS = {
+    "select_expense_report_by_period.sql": "reporting",
+    "select_monthly_income_and_spending.sql": "reporting",
+    "select_balance_current.sql": "reporting",
+    "select_balance_month_end_by_bucket.sql": "reporting",
+    "select_spending_alerts_by_period.sql": "reporting",
+    "select_transactions_page.sql": "reporting",
+    "select_transactions_search.sql": "reporting",
+    "select_budget_rollover_preview.sql": "reporting",
+    "insert_budget_rollover.sql": "reporting",
+    "select_lock_budget_rollover.sql": "reporting",
+    "insert_balance_checkpoints.sql": "batch",
+    "select_balance_ledger_mismatches.sql": "batch",
+    "select_balance_checkpoint_mismatches.sql": "batch",
+    "delete_balance_checkpoint_mismatches.sql": "batch",
+    "select_users.sql": "batch",
+}
+# Schema and maintenance scripts
+BATCH_PREFIXES = ("create_", "rebuild_")
+
+def workload_for(query_path):
+    """Return the workload class of a named query."""
+    name = os.path.basename(query_path)
+    if name.startswith(BATCH_PREFIXES):
+        return BATCH
+    return WORKLOAD_CLASSES[QUERY_WORKLOADS.get(name, "interactive")]
+
+def workload_stats():
+    return {
+        name: {
+            "in_flight": workload.in_flight,
+            "max_concurrency": workload.max_concurrency,
+            "statement_timeout_ms": workload.statement_timeout_ms,
+            "rejected": workload.rejected,
+            "timed_out": workload.timed_out,
+            "cancelled": workload.cancelled,
+        }
+        for name, workload in WORKLOAD_CLASSES.items()
+    }
+
+# Cancellation of queries whose Streamlit rerun was superseded. A rerun requested while a query is running only
+# takes effect when the script returns from the database call, so a watcher thread cancels the query server-side.
+
+_running_lock = threading.Lock()
+_running = {}
+_watcher = None
+WATCH_INTERVAL_S = 0.2
+# Streamlit versions whose internal ScriptRequests state _superseded() reads (covered by tests/test_workload.py)
+SCRIPT_REQUESTS_VERSIONS = ("1.31.",)
+
+def _script_run_ctx():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return None
+    return get_script_run_ctx()
+
+@functools.lru_cache(maxsize=None)
+def _script_requests_supported():
+    try:
+        import streamlit
+    except ImportError:
+        return False
+    return streamlit.__version__.startswith(SCRIPT_REQUESTS_VERSIONS)
+
+def _superseded(ctx):
+    """True when the session issuing the query has a pending rerun or stop, or has disconnected."""
+    # ScriptRequests is Streamlit-internal and only trusted on tested versions; otherwise only disconnects
+    # and the statement_timeout apply
+    if _script_requests_supported():
+        state = getattr(getattr(ctx.script_requests, "_state", None), "name", None)
+        if state in ("RERUN", "STOP"):
+            return True
+    try:
+        from streamlit.runtime import Runtime
+        return Runtime.exists() and not Runtime.instance().is_active_session(ctx.session_id)
+    except (ImportError, AttributeError):
+        return False
+
+def _watch():
+    while True:
+        time.sleep(WATCH_INTERVAL_S)
+        with _running_lock:
+            running = list(_running.items())
+        for token, (conn, ctx, workload) in running:
+            if not _superseded(ctx):
+                continue
+            # Cancel under the lock: once unregister_query() returns, the connection may serve another query
+            with _running_lock:
+                if _running.pop(token, None) is None:
+                    continue
+                token.cancelled = True
+                workload.count("cancelled")
+                try:
+                    conn.cancel()
+                except Exception:
+                    pass
+
+class QueryToken:
+    """Handle of one running query; `cancelled` is set when the watcher cancelled it."""
+    def __init__(self):
+        self.cancelled = False
+
+def register_query(conn, workload):
+    """
+    Watch a read issued from a Streamlit script run. Returns a token for unregister_query().
+    Writes are never registered: cancelling them would drop user input that the superseding rerun does not resend.
+    """
+    global _watcher
+    token = QueryToken()
+    ctx = _script_run_ctx()
+    if ctx is None:
+        return token
+    with _running_lock:
+        _running[token] = (conn, ctx, workload)
+        if _watcher is None:
+            _watcher = threading.Thread(target=_watch, name="query-cancel-watcher", daemon=True)
+            _watcher.start()
+    return token
+
+def unregister_query(token):
+    with _running_lock:
+        _running.pop(token, None)